@@ -2,24 +2,1661 @@
 # 28.01.2025
 import os
 import codecs
-from java.lang import System
+import hashlib
+import json
+import inspect
+import pstats
+import struct
+import threading
+import uuid
+from bisect import bisect_left, bisect_right
+from collections import deque
+try:
+    from ConfigParser import SafeConfigParser as ConfigParser    # Jython 2.7
+except ImportError:
+    from configparser import ConfigParser
+try:
+    import cProfile as profile_module
+except ImportError:
+    import profile as profile_module    # Jython: gleiche Schnittstelle und gleiches Ausgabeformat, ohne C-Erweiterung
+from java.io import IOException
+from java.lang import Class, Integer, Long, Runtime, System
+from java.sql import DriverManager
 from java.util.logging import Level
 from org.sleuthkit.datamodel import TskData
 from org.sleuthkit.autopsy.casemodule import Case
 from org.sleuthkit.autopsy.coreutils import Logger
+from org.sleuthkit.autopsy.ingest import DataSourceIngestModule
+from org.sleuthkit.autopsy.ingest import IngestModule
+from org.sleuthkit.autopsy.ingest import IngestModuleFactoryAdapter
 from org.sleuthkit.autopsy.report import GeneralReportModuleAdapter
 from org.sleuthkit.autopsy.report.ReportProgressPanel import ReportStatus
 from org.sleuthkit.datamodel import BlackboardArtifact
 from org.sleuthkit.datamodel import BlackboardAttribute
 from java.time import Instant, ZoneId, ZonedDateTime
 from java.time.format import DateTimeFormatter
-from org.sleuthkit.autopsy.casemodule.services import Blackboard
-from java.util import Arrays
+from org.sleuthkit.datamodel import TskCoreException
+from org.sleuthkit.datamodel.Blackboard import BlackboardException
+from java.util import ArrayList, Arrays
+from java.util.concurrent import Callable, ExecutionException, Executors, TimeoutException, TimeUnit
+from java.util.concurrent.atomic import AtomicBoolean
 from org.sleuthkit.datamodel import Score
 from org.sleuthkit.datamodel import ReadContentInputStream
 import jarray
 
 
+# Zeitzone und Format aller Zeitstempel im Bericht
+REPORT_ZONE_ID = "Europe/Berlin"
+TIMESTAMP_PATTERN = "yyyy-MM-dd HH:mm:ss.SSS"
+
+# Einstellungs- und Indikatordatei liegen neben dem Plugin, fehlende Werte werden durch die Standardwerte ersetzt
+PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
+SETTINGS_FILE = os.path.join(PLUGIN_DIR, "BadUSB_Settings.ini")
+DEFAULT_WINDOW_MINUTES = 5
+DEFAULT_INDICATORS_FILE = "BadUSB_Indicators.txt"
+CHECKPOINT_FILE = "correlation_checkpoint.json"
+CANCEL_POLL_MILLIS = 200        # Intervall, in dem beim Warten auf Worker der Abbruch geprüft wird
+
+# Standard-Indikatoren, falls keine Indikatordatei vorhanden ist
+DEFAULT_INDICATORS = {
+    # Verdächtige Programme im Zeitfenster eines USB-Anschlusses
+    "executables": [
+        "ipconfig.exe", "whoami.exe", "netstat.exe", "ping.exe",
+        "nslookup.exe", "tasklist.exe", "dir.exe",
+        "curl.exe", "wget.exe", "tar.exe", "echo.exe", "cmd.exe", "powershell.exe", "mpcmdrun.exe", "windowsterminal.exe",
+        "openconsole.exe"
+    ],
+    # Programme, deren Ausführung die Auswertung der PowerShell-Spuren auslöst
+    "powershell_hosts": [
+        "powershell"
+    ],
+    # PowerShell-Befehle und Registry-Werte zum Deaktivieren von Windows Defender
+    "defender_tamper": [
+        "Set-MpPreference -DisableRealtimeMonitoring",
+        "Set-MpPreference -DisableBehaviorMonitoring",
+        "Set-MpPreference -DisableBlockAtFirstSeen",
+    ],
+}
+
+
+# Liest die Einstellungen des Moduls aus der INI-Datei
+def load_settings(path=SETTINGS_FILE):
+    settings = {"window_minutes": DEFAULT_WINDOW_MINUTES,
+                "indicators_file": os.path.join(PLUGIN_DIR, DEFAULT_INDICATORS_FILE),
+                "incremental": True,
+                "workers": 0,
+                "formats": [],
+                "event_logs": True,
+                "run_summary": False,
+                "profile": False}
+    parser = ConfigParser()
+    # Eine fehlende Datei ist kein Fehler, es gelten dann die Standardwerte
+    if not parser.read(path):
+        return settings
+    if parser.has_option("correlation", "window_minutes"):
+        settings["window_minutes"] = parser.getint("correlation", "window_minutes")
+    if parser.has_option("correlation", "event_logs"):
+        settings["event_logs"] = parser.getboolean("correlation", "event_logs")
+    if parser.has_option("indicators", "file"):
+        # Relative Pfade beziehen sich auf das Plugin-Verzeichnis
+        settings["indicators_file"] = os.path.join(PLUGIN_DIR, parser.get("indicators", "file"))
+    if parser.has_option("report", "incremental"):
+        settings["incremental"] = parser.getboolean("report", "incremental")
+    if parser.has_option("report", "workers"):
+        settings["workers"] = parser.getint("report", "workers")
+    if parser.has_option("report", "additional_formats"):
+        formats = [name.strip().lower() for name in parser.get("report", "additional_formats").split(",")]
+        settings["formats"] = [name for name in formats if name in REPORT_WRITERS]
+    if parser.has_option("report", "run_summary"):
+        settings["run_summary"] = parser.getboolean("report", "run_summary")
+    if parser.has_option("report", "profile"):
+        settings["profile"] = parser.getboolean("report", "profile")
+    return settings
+
+
+# Liest die Indikatoren abschnittsweise ([abschnitt], ein Muster pro Zeile, # für Kommentare)
+def load_indicators(path):
+    if not os.path.isfile(path):
+        return dict((section, list(patterns)) for section, patterns in DEFAULT_INDICATORS.items())
+    sections = {}
+    current = None
+    indicator_file = codecs.open(path, "r", "utf-8-sig")
+    try:
+        for line in indicator_file:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("[") and line.endswith("]"):
+                current = sections.setdefault(line[1:-1].strip().lower(), [])
+            elif current is not None:
+                current.append(line)
+    finally:
+        indicator_file.close()
+    return sections
+
+
+# Formatiert einen Epoch-Zeitstempel (Sekunden) in die lokale Berichtszeit
+def format_timestamp(epoch_seconds):
+    local_time = ZonedDateTime.ofInstant(Instant.ofEpochSecond(epoch_seconds), ZoneId.of(REPORT_ZONE_ID))
+    return local_time.format(DateTimeFormatter.ofPattern(TIMESTAMP_PATTERN))
+
+
+# Attributtypen, die aus den Artefakten gelesen werden (Typ-ID -> Getter des Wertes)
+_ATTR_DATETIME = BlackboardAttribute.ATTRIBUTE_TYPE.TSK_DATETIME.getTypeID()
+_ATTR_PROG_NAME = BlackboardAttribute.ATTRIBUTE_TYPE.TSK_PROG_NAME.getTypeID()
+_ATTR_COUNT = BlackboardAttribute.ATTRIBUTE_TYPE.TSK_COUNT.getTypeID()
+_ATTR_COMMENT = BlackboardAttribute.ATTRIBUTE_TYPE.TSK_COMMENT.getTypeID()
+_ATTR_PATH = BlackboardAttribute.ATTRIBUTE_TYPE.TSK_PATH.getTypeID()
+_ATTR_DEVICE_ID = BlackboardAttribute.ATTRIBUTE_TYPE.TSK_DEVICE_ID.getTypeID()
+_ATTR_DEVICE_MAKE = BlackboardAttribute.ATTRIBUTE_TYPE.TSK_DEVICE_MAKE.getTypeID()
+_ATTR_DEVICE_MODEL = BlackboardAttribute.ATTRIBUTE_TYPE.TSK_DEVICE_MODEL.getTypeID()
+
+_PROGRAM_ATTRIBUTES = {
+    _ATTR_DATETIME: lambda attr: attr.getValueLong(),
+    _ATTR_PROG_NAME: lambda attr: attr.getValueString(),
+    _ATTR_COUNT: lambda attr: attr.getValueInt(),
+    _ATTR_COMMENT: lambda attr: attr.getValueString(),
+    _ATTR_PATH: lambda attr: attr.getValueString(),
+}
+_DEVICE_ATTRIBUTES = {
+    _ATTR_DATETIME: lambda attr: attr.getValueLong(),
+    _ATTR_DEVICE_ID: lambda attr: attr.getValueString(),
+    _ATTR_DEVICE_MAKE: lambda attr: attr.getValueString(),
+    _ATTR_DEVICE_MODEL: lambda attr: attr.getValueString(),
+}
+
+
+# Liest alle benötigten Attribute eines Artefakts mit einem einzigen getAttributes()-Aufruf
+def read_attributes(artifact, wanted):
+    values = {}
+    for attr in artifact.getAttributes():
+        type_id = attr.getAttributeType().getTypeID()
+        # Wie getAttribute() gilt das erste Attribut eines Typs
+        if type_id in wanted and type_id not in values:
+            values[type_id] = wanted[type_id](attr)
+    return values
+
+
+# Kompakter Datensatz einer Programmausführung, alle späteren Phasen arbeiten nur noch hierauf
+class ProgramRecord(object):
+    __slots__ = ("epoch", "name", "name_lower", "count", "comment", "path", "data_source_id")
+
+    def __init__(self, epoch, name, count, comment, path, data_source_id):
+        self.epoch = epoch                  # Epoch-Sekunden, 0 = unbekannt
+        self.name = name
+        self.name_lower = name.lower()
+        self.count = count
+        self.comment = comment
+        self.path = path
+        self.data_source_id = data_source_id
+
+    # Liest die Attribute eines TSK_PROG_RUN-Artefakts
+    @staticmethod
+    def from_artifact(artifact):
+        values = read_attributes(artifact, _PROGRAM_ATTRIBUTES)
+        return ProgramRecord(values.get(_ATTR_DATETIME) or 0, values.get(_ATTR_PROG_NAME) or "",
+                             values.get(_ATTR_COUNT, ""), values.get(_ATTR_COMMENT) or "",
+                             values.get(_ATTR_PATH) or "", artifact.getDataSourceObjectID())
+
+    # Kompakte Listenform für den Checkpoint
+    def to_list(self):
+        return [self.epoch, self.name, self.count, self.comment, self.path, self.data_source_id]
+
+
+# Kompakter Datensatz eines angeschlossenen USB-Geräts
+class DeviceRecord(object):
+    __slots__ = ("epoch", "device_id", "make", "model", "unique_path", "data_source_id")
+
+    def __init__(self, epoch, device_id, make, model, unique_path, data_source_id):
+        self.epoch = epoch
+        self.device_id = device_id
+        self.make = make
+        self.model = model
+        self.unique_path = unique_path
+        self.data_source_id = data_source_id
+
+    # Liest die Attribute eines TSK_DEVICE_ATTACHED-Artefakts
+    @staticmethod
+    def from_artifact(artifact):
+        values = read_attributes(artifact, _DEVICE_ATTRIBUTES)
+        return DeviceRecord(values.get(_ATTR_DATETIME) or 0, values.get(_ATTR_DEVICE_ID) or "",
+                            values.get(_ATTR_DEVICE_MAKE) or "", values.get(_ATTR_DEVICE_MODEL) or "",
+                            artifact.getUniquePath(), artifact.getDataSourceObjectID())
+
+    # Virtuelle USB-Geräte (ROOT_HUB und USB Tablet) erscheinen nicht im Bericht
+    def is_virtual(self):
+        return "ROOT_HUB" in self.model or "USB Tablet" in self.model
+
+    # Kompakte Listenform für den Checkpoint
+    def to_list(self):
+        return [self.epoch, self.device_id, self.make, self.model, self.unique_path, self.data_source_id]
+
+
+# Lädt die Programmausführungen einmalig in der Reihenfolge der Artefakte; sortiert wird erst die gefilterte Liste
+def load_program_records(artifacts):
+    return [ProgramRecord.from_artifact(artifact) for artifact in artifacts]
+
+
+# Lädt die USB-Geräte einmalig in der Reihenfolge der Artefakte
+def load_device_records(artifacts):
+    return [DeviceRecord.from_artifact(artifact) for artifact in artifacts]
+
+
+# Lädt nur Artefakte eines Typs und einer Datenquelle, deren ID größer als die zuletzt verarbeitete ist
+def load_new_artifacts(blackboard, artifact_type, data_source_id, after_artifact_id):
+    return blackboard.getDataArtifactsWhere(
+        "artifacts.artifact_type_id = %d AND artifacts.data_source_obj_id = %d AND artifacts.artifact_id > %d"
+        % (artifact_type.getTypeID(), data_source_id, after_artifact_id))
+
+
+# Höchste Artefakt-ID einer Liste, oder der bisherige Wert
+def max_artifact_id(artifacts, current):
+    for artifact in artifacts:
+        current = max(current, artifact.getArtifactID())
+    return current
+
+
+# Blockgröße für das Lesen von Textdateien aus dem Image
+HISTORY_CHUNK_SIZE = 64 * 1024
+
+
+# Liest eine Datei blockweise als Byte-Strings, der Speicherbedarf hängt nur von der Blockgröße ab
+def iter_file_chunks(content, chunk_size=HISTORY_CHUNK_SIZE, stats=None):
+    stream = ReadContentInputStream(content)
+    buffer = jarray.zeros(chunk_size, "b")
+    try:
+        while True:
+            count = stream.read(buffer)
+            if count <= 0:
+                break
+            if stats is not None:
+                stats.count("bytes read", count)
+            yield buffer.tostring()[:count]
+    finally:
+        stream.close()
+
+
+# Bestimmt die Kodierung anhand der BOM, ohne BOM wird UTF-16LE an Null-Bytes erkannt
+def detect_text_encoding(head):
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if head.startswith(codecs.BOM_UTF16_LE):
+        return "utf-16"
+    if head.startswith(codecs.BOM_UTF16_BE):
+        return "utf-16"
+    if len(head) >= 2 and head[1:2] == b"\x00":
+        return "utf-16-le"
+    return "utf-8"
+
+
+# Dekodiert eine Datei blockweise und liefert Textstücke
+def iter_text_chunks(content, chunk_size=HISTORY_CHUNK_SIZE, stats=None):
+    decoder = None
+    for chunk in iter_file_chunks(content, chunk_size, stats):
+        if decoder is None:
+            # Die Kodierung wird am ersten Block erkannt, die BOM übernimmt der Decoder
+            decoder = codecs.getincrementaldecoder(detect_text_encoding(chunk))(errors="replace")
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    if decoder is not None:
+        text = decoder.decode(b"", True)
+        if text:
+            yield text
+
+
+# Sucht die Indikatoren im Text der Datei und bricht beim ersten Treffer ab,
+# der Zustand des Automaten wird über Blockgrenzen hinweg fortgeführt
+def find_first_indicator(content, matcher, chunk_size=HISTORY_CHUNK_SIZE, stats=None):
+    state = 0
+    for text in iter_text_chunks(content, chunk_size, stats):
+        rule, state = matcher.scan(text, state)
+        if rule is not None:
+            return rule
+    return None
+
+
+# Einzelne Indikatorregel, die bei einem Treffer mit ausgegeben wird
+class IndicatorRule(object):
+    __slots__ = ("section", "pattern")
+
+    def __init__(self, section, pattern):
+        self.section = section
+        self.pattern = pattern
+
+    # Die Muster stammen aus der UTF-8-Regeldatei: Text immer als unicode bilden, nie über str()
+    def __unicode__(self):
+        return u"%s:%s" % (self.section, self.pattern)
+
+    __str__ = __unicode__       # CPython 3 (Benchmarks)
+
+
+# Aho-Corasick-Automat über alle Muster eines Abschnitts: ein Durchlauf pro Text,
+# unabhängig von der Anzahl der Regeln, ohne Beachtung der Groß-/Kleinschreibung
+class IndicatorMatcher(object):
+
+    def __init__(self, rules):
+        self._goto = [{}]       # Übergänge je Zustand
+        self._fail = [0]        # Fehlerverweise je Zustand
+        self._out = [None]      # Regel, die in diesem Zustand (oder über Fehlerverweise) endet
+        self._cache = {}        # Ergebnisse je Text, Programmnamen wiederholen sich häufig
+        for rule in rules:
+            if rule.pattern:
+                self._add(rule)
+        self._link()
+
+    # Fügt ein Muster in den Präfixbaum ein
+    def _add(self, rule):
+        state = 0
+        for char in rule.pattern.lower():
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(None)
+                self._goto[state][char] = next_state
+            state = next_state
+        if self._out[state] is None:
+            self._out[state] = rule
+
+    # Berechnet die Fehlerverweise in Breitensuche
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                if self._out[next_state] is None:
+                    self._out[next_state] = self._out[self._fail[next_state]]
+
+    # Durchsucht einen Text ab einem Zustand und liefert (erste Regel oder None, neuer Zustand),
+    # damit Texte blockweise über mehrere Aufrufe hinweg durchsucht werden können
+    def scan(self, text, state=0):
+        goto, fail, out = self._goto, self._fail, self._out
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state] is not None:
+                return out[state], state
+        return None, state
+
+    # Liefert die erste Regel, die im Text vorkommt, oder None
+    def match(self, text):
+        if text not in self._cache:
+            self._cache[text] = self.scan(text)[0]
+        return self._cache[text]
+
+
+# Kompiliert alle Indikatorabschnitte einmal pro Lauf
+class IndicatorSet(object):
+
+    def __init__(self, sections):
+        self.executables = self._compile(sections, "executables")
+        self.powershell_hosts = self._compile(sections, "powershell_hosts")
+        self.defender_tamper = self._compile(sections, "defender_tamper")
+
+    @staticmethod
+    def _compile(sections, section):
+        return IndicatorMatcher([IndicatorRule(section, pattern) for pattern in sections.get(section, [])])
+
+
+# Beweisdateien, die abhängig von den gefundenen Programmausführungen markiert werden (Namen klein geschrieben)
+APPLICATION_LOG = "application.evtx"
+SECURITY_LOG = "security.evtx"
+POWERSHELL_LOG = "windows powershell.evtx"
+DEFENDER_LOG = "microsoft-windows-windows defender%4operational.evtx"
+POWERSHELL_HISTORY = "consolehost_history.txt"
+
+# Eine Abfrage über alle Datenquellen: Event Logs und PSReadLine-Befehlshistorien aller Benutzer
+EVIDENCE_QUERY = (
+    "(LOWER(name) IN ('%s', '%s', '%s', '%s') AND LOWER(parent_path) LIKE '%%/windows/system32/winevt/logs/')"
+    " OR (LOWER(name) = '%s' AND LOWER(parent_path) LIKE '%%/users/%%/appdata/roaming/microsoft/windows/powershell/psreadline/')"
+    % (APPLICATION_LOG, SECURITY_LOG, POWERSHELL_LOG, DEFENDER_LOG, POWERSHELL_HISTORY))
+
+
+# Hält die Beweisdateien aller Datenquellen für die Dauer eines Laufs vor,
+# die Anzahl der Datenbankabfragen hängt nicht von der Anzahl der Datenquellen ab
+class EvidenceIndex(object):
+
+    def __init__(self, sleuthkit_case, data_source_id=None, stats=None):
+        self._case = sleuthkit_case
+        self._data_source_id = data_source_id   # Optional auf eine Datenquelle beschränkt (Ingest)
+        self._stats = stats if stats is not None else RunStatistics()
+        self._files = None      # (Datenquellen-ID, Dateiname klein) -> [Dateien]
+        self._lock = threading.Lock()   # Die Worker teilen sich einen Index
+
+    # Führt die Abfrage beim ersten Zugriff aus und gruppiert das Ergebnis nach Datenquelle
+    def _load(self):
+        self._files = {}
+        query = EVIDENCE_QUERY
+        if self._data_source_id is not None:
+            query = "data_source_obj_id = %d AND (%s)" % (self._data_source_id, EVIDENCE_QUERY)
+        for evidence_file in self._case.findAllFilesWhere(query):
+            key = (evidence_file.getDataSourceObjectId(), evidence_file.getName().lower())
+            self._files.setdefault(key, []).append(evidence_file)
+
+    # Gibt die Dateien mit dem Namen in der Datenquelle zurück
+    def files(self, data_source_id, name):
+        with self._lock:
+            if self._files is None:
+                with self._stats.phase("evidence lookup"):
+                    self._load()
+                self._stats.count("findAllFilesWhere calls")
+        return list(self._files.get((data_source_id, name), []))
+
+
+# Windows Event Logs (EVTX): 4 KiB Dateikopf, danach Blöcke (Chunks) zu je 64 KiB mit eigenem
+# String- und Template-Bereich; alle Offsets innerhalb eines Blocks sind relativ zum Blockanfang
+EVTX_FILE_HEADER_SIZE = 0x1000
+EVTX_CHUNK_SIZE = 0x10000
+EVTX_CHUNK_HEADER_SIZE = 0x200
+EVTX_RECORD_HEADER_SIZE = 24
+EVTX_CHUNK_SIGNATURE = b"ElfChnk\x00"
+EVTX_RECORD_SIGNATURE = 0x00002a2a
+FILETIME_EPOCH_DELTA = 11644473600     # Sekunden zwischen 1601-01-01 (FILETIME) und 1970-01-01
+
+# Ausgewertete Ereignisse je Event Log: (Anzeigename, {Event-ID: (Beschreibung, Pfadfeld, Kommentarfelder)})
+EVENT_LOG_EVENTS = {
+    SECURITY_LOG: ("Security", {
+        4688: ("Process Creation", "NewProcessName", ("CommandLine", "ParentProcessName", "SubjectUserName")),
+        4624: ("Logon", None, ("TargetUserName", "TargetDomainName", "LogonType", "IpAddress")),
+    }),
+    POWERSHELL_LOG: ("Windows PowerShell", {
+        400: ("Engine Started", "HostApplication", ("HostName", "EngineVersion", "CommandLine")),
+        403: ("Engine Stopped", "HostApplication", ("HostName", "EngineVersion", "CommandLine")),
+        600: ("Provider Started", "HostApplication", ("ProviderName",)),
+    }),
+    DEFENDER_LOG: ("Windows Defender", {
+        5001: ("Real-time Protection Disabled", None, ("Product Name", "Product Version")),
+        5007: ("Configuration Changed", None, ("Old Value", "New Value")),
+    }),
+}
+
+# Ganzzahlige Werttypen der Binary XML: Typ -> struct-Format
+_EVTX_INTEGER_TYPES = {0x03: "<b", 0x04: "<B", 0x05: "<h", 0x06: "<H", 0x07: "<i", 0x08: "<I",
+                       0x09: "<q", 0x0a: "<Q", 0x0d: "<I", 0x14: "<I", 0x15: "<Q"}
+
+
+# Kompakter Datensatz eines Ereignisses aus einem Event Log
+class EventRecord(object):
+    __slots__ = ("epoch", "log_name", "event_id", "record_id", "file_id", "path", "comment")
+
+    def __init__(self, epoch, log_name, event_id, record_id, file_id, path, comment):
+        self.epoch = epoch
+        self.log_name = log_name            # Name der Logdatei klein geschrieben, Schlüssel in EVENT_LOG_EVENTS
+        self.event_id = event_id
+        self.record_id = record_id
+        self.file_id = file_id
+        self.path = path
+        self.comment = comment
+
+    # Programmfelder der Berichtszeile: Ereignis, Zeitstempel, Pfad und ausgewählte Datenfelder
+    def report_fields(self, correlator):
+        display_name, events = EVENT_LOG_EVENTS[self.log_name]
+        return ["%s %d (%s)" % (display_name, self.event_id, events[self.event_id][0]),
+                correlator.format(self.epoch), self.epoch, None, self.comment, self.path,
+                "eventlog:%s/%d" % (display_name, self.event_id)]
+
+    # Kompakte Listenform für den Checkpoint
+    def to_list(self):
+        return [self.epoch, self.log_name, self.event_id, self.record_id, self.file_id, self.path, self.comment]
+
+
+# Beschreibung eines Templates: Substitutionen der EventID und der Data-Elemente in EventData
+class EvtxTemplate(object):
+    __slots__ = ("event_id_index", "fields")
+
+    def __init__(self, event_id_index, fields):
+        self.event_id_index = event_id_index    # Index der Substitution mit der Event-ID oder None
+        self.fields = fields                    # [(Name oder Position des Data-Elements, Substitutionsindex)]
+
+
+# Liest die Ereignisse eines 64-KiB-Blocks. Templates und Namen werden nur einmal pro Block
+# ausgewertet, der Zwischenspeicher wird mit dem Block verworfen.
+class EvtxChunk(object):
+
+    def __init__(self, data):
+        self._data = data
+        self._templates = {}    # Offset der Template-Definition -> EvtxTemplate oder None
+        self._names = {}        # Offset des Namens -> Name
+
+    # Zeitraum des Blocks aus dem ersten und letzten Datensatz (der Blockkopf enthält keine Zeitstempel)
+    @staticmethod
+    def time_range(header, last_record):
+        first = evtx_record_epoch(header, EVTX_CHUNK_HEADER_SIZE)
+        last = evtx_record_epoch(last_record, 0)
+        if first is None or last is None:
+            return None
+        return min(first, last), max(first, last)
+
+    # Liefert (Datensatz-ID, Epoch, Event-ID, Felder) der gesuchten Ereignisse im Zeitfenster
+    def events(self, event_ids, windows):
+        data = self._data
+        free_space = min(struct.unpack_from("<I", data, 0x30)[0], len(data))
+        offset = EVTX_CHUNK_HEADER_SIZE
+        while offset + EVTX_RECORD_HEADER_SIZE <= free_space:
+            signature, size, record_id, filetime = struct.unpack_from("<IIQQ", data, offset)
+            if signature != EVTX_RECORD_SIGNATURE or size < EVTX_RECORD_HEADER_SIZE + 4 or offset + size > free_space:
+                break
+            epoch = filetime // 10000000 - FILETIME_EPOCH_DELTA
+            # Der Zeitstempel steht im Datensatzkopf, die Binary XML wird nur im Zeitfenster gelesen
+            if windows.contains(epoch):
+                try:
+                    event = self._event(offset + EVTX_RECORD_HEADER_SIZE, event_ids)
+                except (struct.error, IndexError, ValueError):
+                    event = None    # Beschädigter Datensatz
+                if event is not None:
+                    yield (record_id, epoch) + event
+            offset += size
+
+    # Liest Event-ID und Datenfelder eines Datensatzes: Fragment-Kopf, Template-Instanz, Substitutionen
+    def _event(self, pos, event_ids):
+        data = self._data
+        if _byte(data, pos) == 0x0f:
+            pos += 4
+        if _byte(data, pos) & 0x0f != 0x0c:
+            return None
+        template_offset = struct.unpack_from("<I", data, pos + 6)[0]
+        pos += 10
+        if template_offset == pos:
+            # Die Definition folgt direkt auf die Instanz, wenn das Template im Block neu ist
+            pos += 24 + struct.unpack_from("<I", data, pos + 20)[0]
+        template = self._template(template_offset)
+        if template is None:
+            return None
+
+        # Substitutionsarray: Anzahl, dann (Größe, Typ) je Wert, dann die Werte hintereinander
+        count = struct.unpack_from("<I", data, pos)[0]
+        descriptors = []
+        value_offset = pos + 4 + 4 * count
+        for index in range(count):
+            size, value_type = struct.unpack_from("<HB", data, pos + 4 + 4 * index)
+            descriptors.append((value_offset, size, value_type))
+            value_offset += size
+        if template.event_id_index >= count:
+            return None
+        event_id = evtx_value(data, *descriptors[template.event_id_index])
+        if event_id not in event_ids:
+            return None
+        fields = {}
+        for key, index in template.fields:
+            value = evtx_value(data, *descriptors[index]) if index < count else None
+            if value is None:
+                continue
+            fields[key] = u"%s" % (value,)
+            # Unbenannte Data-Elemente (klassische Logs wie Windows PowerShell) enthalten Zeilen "Name=Wert"
+            if isinstance(key, int):
+                for line in fields[key].splitlines():
+                    name, separator, text = line.partition(u"=")
+                    if separator and name.strip():
+                        fields.setdefault(name.strip(), text.strip())
+        return event_id, fields
+
+    # Wertet eine Template-Definition einmal pro Block aus
+    def _template(self, offset):
+        if offset not in self._templates:
+            try:
+                data_length = struct.unpack_from("<I", self._data, offset + 20)[0]
+                self._templates[offset] = self._parse_template(offset + 24, offset + 24 + data_length)
+            except (struct.error, IndexError, ValueError):
+                self._templates[offset] = None
+        return self._templates[offset]
+
+    # Durchläuft die Binary XML des Templates und merkt sich, welche Substitutionen
+    # den Inhalt von EventID und der Data-Elemente bilden
+    def _parse_template(self, pos, end):
+        data = self._data
+        stack = []              # [Elementname, Wert des Name-Attributs]
+        attribute = None        # Name des Attributs, dessen Wert gerade gelesen wird
+        event_id_index = None
+        fields = []
+        data_elements = 0       # Position unbenannter Data-Elemente
+        while pos < end:
+            token = _byte(data, pos)
+            kind = token & 0x0f
+            if kind == 0x00:                            # Ende des Fragments
+                break
+            elif kind == 0x01:                          # Start eines Elements
+                name, pos = self._name(struct.unpack_from("<I", data, pos + 7)[0], pos + 11)
+                if token & 0x40:
+                    pos += 4                            # Größe der Attributliste
+                stack.append([name, None])
+                attribute = None
+            elif kind in (0x02, 0x03, 0x04):            # Ende des Starttags, leeres Element, Endtag
+                if kind != 0x02 and stack:
+                    stack.pop()
+                attribute = None
+                pos += 1
+            elif kind == 0x05:                          # Wert (im Template nur Text)
+                if _byte(data, pos + 1) != 0x01:
+                    return None
+                length = struct.unpack_from("<H", data, pos + 2)[0]
+                if attribute == "Name" and stack:
+                    stack[-1][1] = data[pos + 4:pos + 4 + 2 * length].decode("utf-16-le")
+                pos += 4 + 2 * length
+            elif kind == 0x06:                          # Attribut, der Wert folgt als eigenes Token
+                attribute, pos = self._name(struct.unpack_from("<I", data, pos + 1)[0], pos + 5)
+            elif kind == 0x07 or kind == 0x0b:          # CDATA, Daten einer Verarbeitungsanweisung
+                pos += 3 + 2 * struct.unpack_from("<H", data, pos + 1)[0]
+            elif kind == 0x08:                          # Zeichenreferenz
+                pos += 3
+            elif kind == 0x09 or kind == 0x0a:          # Entity-Referenz, Ziel einer Verarbeitungsanweisung
+                pos = self._name(struct.unpack_from("<I", data, pos + 1)[0], pos + 5)[1]
+            elif kind == 0x0d or kind == 0x0e:          # Normale und optionale Substitution
+                index = struct.unpack_from("<H", data, pos + 1)[0]
+                if attribute is None and stack:
+                    element = stack[-1]
+                    if element[0] == "EventID":
+                        event_id_index = index
+                    elif element[0] == "Data":
+                        if element[1] is None:
+                            fields.append((data_elements, index))
+                            data_elements += 1
+                        else:
+                            fields.append((element[1], index))
+                pos += 4
+            elif kind == 0x0f:                          # Fragment-Kopf
+                pos += 4
+            else:                                       # Verschachtelte Template-Instanzen kommen in Templates nicht vor
+                return None
+        if event_id_index is None:
+            return None
+        return EvtxTemplate(event_id_index, fields)
+
+    # Liest einen Namen aus der String-Tabelle des Blocks; steht er an der aktuellen Position, wird er übersprungen
+    def _name(self, offset, pos):
+        name = self._names.get(offset)
+        if name is None:
+            length = struct.unpack_from("<H", self._data, offset + 6)[0]
+            name = self._names[offset] = self._data[offset + 8:offset + 8 + 2 * length].decode("utf-16-le")
+        if offset == pos:
+            pos += 10 + 2 * len(name)
+        return name, pos
+
+
+# Liest ein einzelnes Byte unabhängig davon, ob die Daten als str oder bytes vorliegen
+def _byte(data, pos):
+    return struct.unpack_from("<B", data, pos)[0]
+
+
+# Zeitstempel eines Datensatzkopfes in Epoch-Sekunden oder None, wenn dort kein Datensatz beginnt
+def evtx_record_epoch(data, offset):
+    if len(data) < offset + EVTX_RECORD_HEADER_SIZE:
+        return None
+    signature, _, _, filetime = struct.unpack_from("<IIQQ", data, offset)
+    if signature != EVTX_RECORD_SIGNATURE:
+        return None
+    return filetime // 10000000 - FILETIME_EPOCH_DELTA
+
+
+# Dekodiert einen Substitutionswert; nicht benötigte Typen (Binärdaten, eingebettete XML) ergeben None
+def evtx_value(data, offset, size, value_type):
+    if size == 0 or value_type == 0x00:
+        return None
+    if value_type == 0x01:                              # UTF-16-String
+        return data[offset:offset + size].decode("utf-16-le", "replace").rstrip(u"\x00")
+    if value_type == 0x02:                              # ANSI-String
+        return data[offset:offset + size].decode("latin-1").rstrip(u"\x00")
+    if value_type in _EVTX_INTEGER_TYPES:
+        value = struct.unpack_from(_EVTX_INTEGER_TYPES[value_type], data, offset)[0]
+        return "0x%x" % value if value_type in (0x14, 0x15) else value
+    if value_type == 0x11:                              # FILETIME
+        return format_timestamp(struct.unpack_from("<Q", data, offset)[0] // 10000000 - FILETIME_EPOCH_DELTA)
+    if value_type == 0x13 and size >= 8:                # SID
+        revision, count = struct.unpack_from("<BB", data, offset)
+        authority = struct.unpack_from(">Q", b"\x00\x00" + data[offset + 2:offset + 8])[0]
+        return "S-%d-%d" % (revision, authority) + "".join(
+            "-%d" % struct.unpack_from("<I", data, offset + 8 + 4 * index)[0] for index in range(count))
+    return None
+
+
+# Liest ein Event Log blockweise über ReadContentInputStream. Zuerst werden nur Blockkopf und
+# letzter Datensatzkopf gelesen; liegt der Zeitraum des Blocks außerhalb aller Gerätefenster,
+# wird der Block übersprungen. Der Speicherbedarf ist auf einen Block begrenzt.
+def iter_evtx_events(content, log_name, windows, is_cancelled, stats=None):
+    event_ids = EVENT_LOG_EVENTS[log_name][1]
+    stream = ReadContentInputStream(content)
+    buffer = jarray.zeros(EVTX_CHUNK_SIZE, "b")
+    try:
+        chunk_offset = EVTX_FILE_HEADER_SIZE
+        while chunk_offset + EVTX_CHUNK_SIZE <= content.getSize():
+            if is_cancelled():
+                return
+            header = _read_at(stream, buffer, chunk_offset, EVTX_CHUNK_HEADER_SIZE + EVTX_RECORD_HEADER_SIZE, stats)
+            if header[:8] == EVTX_CHUNK_SIGNATURE:
+                last_record = struct.unpack_from("<I", header, 0x2c)[0]
+                time_range = EvtxChunk.time_range(
+                    header, _read_at(stream, buffer, chunk_offset + last_record, EVTX_RECORD_HEADER_SIZE, stats)
+                    if last_record + EVTX_RECORD_HEADER_SIZE <= EVTX_CHUNK_SIZE else b"")
+                # Ohne lesbaren Zeitraum wird der Block vollständig geprüft, die Datensätze haben eigene Zeitstempel
+                if time_range is None or windows.overlaps(*time_range):
+                    chunk = EvtxChunk(_read_at(stream, buffer, chunk_offset, EVTX_CHUNK_SIZE, stats))
+                    for event in chunk.events(event_ids, windows):
+                        yield event
+            chunk_offset += EVTX_CHUNK_SIZE
+    finally:
+        stream.close()
+
+
+# Liest einen Bereich der Datei ab einem Offset vollständig in den Puffer
+def _read_at(stream, buffer, offset, length, stats=None):
+    stream.seek(offset)
+    count = 0
+    while count < length:
+        read = stream.read(buffer, count, length - count)
+        if read <= 0:
+            break
+        count += read
+    if stats is not None:
+        stats.count("bytes read", count)
+    return buffer[:count].tostring()
+
+
+# Name der Interesting-Files-Menge, unter der alle Beweisdateien markiert werden
+INTERESTING_SET_NAME = "BadUSB: Event Logs und Datei-Analyse"
+
+
+# Sammelt die Interesting-File-Ergebnisse eines Laufs und veröffentlicht sie gebündelt
+class InterestingFileBatch(object):
+
+    def __init__(self, sleuthkit_case, module_name, known=None, ingest_job_id=None):
+        self._case = sleuthkit_case
+        self._blackboard = sleuthkit_case.getBlackboard()
+        self._module_name = module_name
+        self._ingest_job_id = ingest_job_id
+        # Dieselbe Attributliste wird für alle Ergebnisse verwendet
+        self._attrs = Arrays.asList(BlackboardAttribute(BlackboardAttribute.Type.TSK_SET_NAME,
+                                                        module_name, INTERESTING_SET_NAME))
+        self._pending = []      # (Datei, Begründung) in der Reihenfolge der Markierung
+        self._keys = set()      # (Objekt-ID, Begründung) der vorgemerkten Ergebnisse
+        self._known = known if known is not None else set()     # In früheren Läufen markiert, wird fortgeschrieben
+
+    # Merkt eine Datei zur Markierung vor, doppelte Markierungen innerhalb eines Laufs werden übersprungen
+    def add(self, evidence_file, justification):
+        key = (evidence_file.getId(), justification)
+        if key in self._keys or key in self._known:
+            return False
+        self._keys.add(key)
+        self._pending.append((evidence_file, justification))
+        return True
+
+    # Liest mit einer Abfrage die BadUSB-Ergebnisse früherer Läufe zu den vorgemerkten Dateien;
+    # die Begründung steht wie in allen früheren Versionen des Moduls im Feld configuration
+    def _existing_keys(self):
+        file_ids = sorted(set(evidence_file.getId() for evidence_file, _ in self._pending))
+        existing = set()
+        for result in self._blackboard.getAnalysisResultsWhere(
+                "artifacts.artifact_type_id = %d AND artifacts.obj_id IN (%s)"
+                % (BlackboardArtifact.Type.TSK_INTERESTING_FILE_HIT.getTypeID(),
+                   ", ".join(str(file_id) for file_id in file_ids))):
+            set_name = result.getAttribute(BlackboardAttribute.Type.TSK_SET_NAME)
+            if set_name is not None and set_name.getValueString() == INTERESTING_SET_NAME:
+                existing.add((result.getObjectID(), result.getConfiguration()))
+        return existing
+
+    # Legt alle vorgemerkten Ergebnisse in einer Transaktion an und postet sie mit einem Ereignis
+    def flush(self):
+        # Identische Ergebnisse aus früheren Läufen werden nicht erneut angelegt
+        existing = self._existing_keys() if self._pending else set()
+        pending = [(evidence_file, justification) for evidence_file, justification in self._pending
+                   if (evidence_file.getId(), justification) not in existing]
+        self._pending = []
+        self._known.update(existing)
+        if not pending:
+            return []
+        artifacts = ArrayList()
+        transaction = self._case.beginTransaction()
+        try:
+            for evidence_file, justification in pending:
+                artifacts.add(self._blackboard.newAnalysisResult(
+                    BlackboardArtifact.Type.TSK_INTERESTING_FILE_HIT, evidence_file.getId(),
+                    evidence_file.getDataSourceObjectId(), Score.SCORE_LIKELY_NOTABLE,
+                    None, justification, None, self._attrs, transaction).getAnalysisResult())
+            transaction.commit()
+        except TskCoreException:
+            transaction.rollback()
+            raise
+        self._known.update((evidence_file.getId(), justification) for evidence_file, justification in pending)
+        self._blackboard.postArtifacts(artifacts, self._module_name, self._ingest_job_id)
+        return artifacts
+
+
+# Format des Checkpoints, ältere Versionen werden verworfen
+CHECKPOINT_VERSION = 3
+
+
+# Fingerabdruck der Einstellungen, die das Ergebnis beeinflussen; ändert er sich, wird neu gerechnet
+def analysis_fingerprint(settings, indicator_sections):
+    state = {"window_minutes": settings["window_minutes"],
+             "event_logs": settings["event_logs"],
+             "indicators": sorted((section, sorted(patterns)) for section, patterns in indicator_sections.items())}
+    return hashlib.sha1(json.dumps(state, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# Zwischenstand einer Datenquelle: verarbeitete Artefakt-IDs und alle berichtsrelevanten Datensätze
+class SourceState(object):
+
+    def __init__(self):
+        self.max_device_artifact_id = 0
+        self.max_program_artifact_id = 0
+        self.devices = []                   # Nicht-virtuelle Geräte in Artefakt-Reihenfolge
+        self.programs = []                  # Verdächtige Programme mit Zeitstempel, nach Zeit sortiert
+        self.has_programs = False           # Datenquelle enthält Programmausführungen
+        self.has_powershell = False         # Datenquelle enthält PowerShell-Ausführungen
+        self.evaluated = None               # [has_programs, has_powershell] beim letzten Auswerten der Beweisdateien
+        self.event_logs = []                # Namen der beim letzten Auswerten markierten Event Logs
+        self.events = []                    # Ereignisse aus den Event Logs im Zeitfenster der Geräte, nach Zeit sortiert
+
+    def to_dict(self):
+        return {"max_device_artifact_id": self.max_device_artifact_id,
+                "max_program_artifact_id": self.max_program_artifact_id,
+                "devices": [device.to_list() for device in self.devices],
+                "programs": [program.to_list() for program in self.programs],
+                "has_programs": self.has_programs,
+                "has_powershell": self.has_powershell,
+                "evaluated": self.evaluated,
+                "event_logs": self.event_logs,
+                "events": [event.to_list() for event in self.events]}
+
+    @staticmethod
+    def from_dict(values):
+        state = SourceState()
+        state.max_device_artifact_id = values["max_device_artifact_id"]
+        state.max_program_artifact_id = values["max_program_artifact_id"]
+        state.devices = [DeviceRecord(*device) for device in values["devices"]]
+        state.programs = [ProgramRecord(*program) for program in values["programs"]]
+        state.has_programs = values["has_programs"]
+        state.has_powershell = values["has_powershell"]
+        state.evaluated = values["evaluated"]
+        state.event_logs = values["event_logs"]
+        state.events = [EventRecord(*event) for event in values["events"]]
+        return state
+
+
+# Zwischenstand der Korrelation im Modulverzeichnis des Falls: Zustand je Datenquelle
+# sowie die bereits markierten Beweisdateien
+class CorrelationCheckpoint(object):
+
+    def __init__(self, path, fingerprint):
+        self.path = path                    # None = Checkpoint wird nicht gespeichert
+        self.fingerprint = fingerprint
+        self.sources = {}                   # Datenquellen-ID -> SourceState
+        self.flagged = set()                # (Datei-ID, Begründung) bereits markierter Beweisdateien
+
+    # Lädt den Checkpoint; fehlt er, ist er beschädigt oder passt er nicht zu den Einstellungen, beginnt ein neuer
+    @staticmethod
+    def load(path, fingerprint):
+        checkpoint = CorrelationCheckpoint(path, fingerprint)
+        if not os.path.isfile(path):
+            return checkpoint
+        try:
+            checkpoint_file = codecs.open(path, "r", "utf-8")
+            try:
+                state = json.load(checkpoint_file)
+            finally:
+                checkpoint_file.close()
+            if state.get("version") != CHECKPOINT_VERSION or state.get("fingerprint") != fingerprint:
+                return checkpoint
+            checkpoint.sources = dict((int(key), SourceState.from_dict(values))
+                                      for key, values in state["sources"].items())
+            checkpoint.flagged = set((file_id, justification) for file_id, justification in state["flagged"])
+        except (ValueError, KeyError, TypeError, IOError):
+            return CorrelationCheckpoint(path, fingerprint)
+        return checkpoint
+
+    # Gibt den Zustand einer Datenquelle zurück, für neue Datenquellen einen leeren Zustand
+    def source(self, data_source_id):
+        if data_source_id not in self.sources:
+            self.sources[data_source_id] = SourceState()
+        return self.sources[data_source_id]
+
+    # Entfernt Einträge von Datenquellen, die nicht mehr im Fall enthalten sind
+    def prune(self, data_source_ids):
+        for data_source_id in list(self.sources):
+            if data_source_id not in data_source_ids:
+                del self.sources[data_source_id]
+
+    # Schreibt den Checkpoint atomar über eine temporäre Datei
+    def save(self):
+        if self.path is None:
+            return
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "fingerprint": self.fingerprint,
+            "sources": dict((str(key), source.to_dict()) for key, source in self.sources.items()),
+            "flagged": sorted(self.flagged),
+        }
+        directory = os.path.dirname(self.path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        temp_path = self.path + ".tmp"
+        checkpoint_file = codecs.open(temp_path, "w", "utf-8")
+        try:
+            json.dump(state, checkpoint_file)
+        finally:
+            checkpoint_file.close()
+        # os.rename überschreibt unter Windows keine vorhandene Datei
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        os.rename(temp_path, self.path)
+
+
+# Ordnet Programmausführungen per binärer Suche dem Zeitfenster eines USB-Anschlusses zu
+class TimeWindowCorrelator(object):
+
+    # programs: ProgramRecords mit Zeitstempel, aufsteigend nach Zeit sortiert
+    def __init__(self, programs, window_minutes=DEFAULT_WINDOW_MINUTES):
+        self._programs = programs
+        self._times = [program.epoch for program in programs]  # Sortiertes Array der Zeitstempel für bisect
+        # Das Fenster entspricht dem bisherigen Vergleich abs(Differenz_ms / 60000) <= N mit
+        # Ganzzahldivision: N Minuten davor bis einschließlich der N-ten vollen Minute danach
+        self._before = window_minutes * 60
+        self._after = (window_minutes + 1) * 60
+        self._formatted = {}                                # Cache der formatierten Zeitstempel
+
+    # Gibt alle Programme im Zeitfenster des USB-Zeitstempels in zeitlicher Reihenfolge zurück
+    def match(self, usb_epoch):
+        lo = bisect_left(self._times, usb_epoch - self._before)
+        hi = bisect_left(self._times, usb_epoch + self._after, lo)
+        return self._programs[lo:hi]
+
+    # Formatiert einen Programmzeitstempel nur einmal pro Lauf
+    def format(self, epoch):
+        formatted = self._formatted.get(epoch)
+        if formatted is None:
+            formatted = self._formatted[epoch] = format_timestamp(epoch)
+        return formatted
+
+
+# Vereinigung der Zeitfenster mehrerer USB-Anschlüsse, gleiche Grenzen wie TimeWindowCorrelator
+class DeviceWindows(object):
+
+    def __init__(self, usb_epochs, window_minutes=DEFAULT_WINDOW_MINUTES):
+        self._starts = []
+        self._ends = []
+        for epoch in sorted(usb_epochs):
+            start, end = epoch - window_minutes * 60, epoch + (window_minutes + 1) * 60
+            # Überlappende Fenster werden zusammengefasst, die Intervalle bleiben sortiert und disjunkt
+            if self._ends and start <= self._ends[-1]:
+                self._ends[-1] = max(self._ends[-1], end)
+            else:
+                self._starts.append(start)
+                self._ends.append(end)
+
+    def __len__(self):
+        return len(self._starts)
+
+    # Liegt der Zeitstempel in einem der Fenster?
+    def contains(self, epoch):
+        index = bisect_right(self._starts, epoch) - 1
+        return index >= 0 and epoch < self._ends[index]
+
+    # Überschneidet der Zeitraum [first, last] eines der Fenster?
+    def overlaps(self, first, last):
+        index = bisect_right(self._starts, last) - 1
+        return index >= 0 and self._ends[index] > first
+
+
+# Spalten einer Berichtszeile: (Schlüssel für JSON Lines und SQLite, SQLite-Typ, Überschrift im CSV oder None)
+REPORT_COLUMNS = [
+    ("device_id", "TEXT", "Device ID"),
+    ("usb_timestamp", "TEXT", "USB Timestamp"),
+    ("usb_epoch", "INTEGER", None),
+    ("device_make", "TEXT", "Device Make"),
+    ("device_model", "TEXT", "Device Model"),
+    ("data_source", "TEXT", "Data Source"),
+    ("program_name", "TEXT", "Program Name"),
+    ("program_timestamp", "TEXT", "Program Timestamp"),
+    ("program_epoch", "INTEGER", None),
+    ("count", "INTEGER", "Count"),
+    ("comment", "TEXT", "Comment"),
+    ("path", "TEXT", "Path"),
+    ("indicator", "TEXT", "Indicator"),
+]
+# Leere Programmfelder für Geräte ohne Programmausführung im Zeitfenster
+EMPTY_PROGRAM_FIELDS = [None] * 7
+
+WRITE_BUFFER_ROWS = 1000        # Zeilen, die gesammelt und gemeinsam geschrieben werden
+SQLITE_TABLE = "badusb_activity"
+
+
+# Wandelt einen Wert in Text um, None wird zum leeren Feld
+def field_text(value):
+    return u"" if value is None else u"%s" % (value,)
+
+
+# Setzt ein CSV-Feld nach RFC 4180 in Anführungszeichen, wenn es Trennzeichen enthält
+def csv_field(value):
+    text = field_text(value)
+    if u"," in text or u'"' in text or u"\n" in text or u"\r" in text:
+        return u'"' + text.replace(u'"', u'""') + u'"'
+    return text
+
+
+# Schreibt Textzeilen gepuffert in eine UTF-8-Datei, der Puffer ist auf eine feste Zeilenzahl begrenzt
+class BufferedLineWriter(object):
+
+    def __init__(self, path):
+        self.path = path
+        self._file = codecs.open(path, "w", "utf-8")
+        self._buffer = []
+
+    def write_line(self, line):
+        self._buffer.append(line)
+        if len(self._buffer) >= WRITE_BUFFER_ROWS:
+            self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            self._file.write(u"\n".join(self._buffer) + u"\n")
+            self._buffer = []
+
+    def close(self):
+        self._flush()
+        self._file.close()
+
+
+# CSV-Ausgabe mit einer Kopfzeile und einer Zeile pro Gerät und Programmausführung
+class CsvReportWriter(BufferedLineWriter):
+
+    def __init__(self, path):
+        BufferedLineWriter.__init__(self, path)
+        self._indexes = [index for index, column in enumerate(REPORT_COLUMNS) if column[2] is not None]
+        self.write_line(u",".join(csv_field(REPORT_COLUMNS[index][2]) for index in self._indexes))
+
+    def write(self, row):
+        self.write_line(u",".join(csv_field(row[index]) for index in self._indexes))
+
+
+# JSON-Lines-Ausgabe mit einem Objekt pro Zeile
+class JsonLinesReportWriter(BufferedLineWriter):
+
+    def __init__(self, path):
+        BufferedLineWriter.__init__(self, path)
+        self._keys = [column[0] for column in REPORT_COLUMNS]
+
+    def write(self, row):
+        self.write_line(json.dumps(dict(zip(self._keys, row)), ensure_ascii=False, sort_keys=True))
+
+
+# SQLite-Ausgabe über den mit Autopsy ausgelieferten JDBC-Treiber, Einfügen in Stapeln
+# innerhalb einer Transaktion, Indizes auf Geräte-ID und Zeitstempel werden zum Schluss angelegt
+class SqliteReportWriter(object):
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.exists(path):
+            os.remove(path)
+        Class.forName("org.sqlite.JDBC")
+        self._connection = DriverManager.getConnection("jdbc:sqlite:" + path)
+        self._connection.setAutoCommit(False)
+        statement = self._connection.createStatement()
+        try:
+            statement.executeUpdate("CREATE TABLE %s (%s)" % (
+                SQLITE_TABLE, ", ".join("%s %s" % (column[0], column[1]) for column in REPORT_COLUMNS)))
+        finally:
+            statement.close()
+        self._insert = self._connection.prepareStatement("INSERT INTO %s VALUES (%s)" % (
+            SQLITE_TABLE, ", ".join("?" * len(REPORT_COLUMNS))))
+        self._pending = 0
+
+    def write(self, row):
+        for index, value in enumerate(row):
+            self._insert.setObject(index + 1, value)
+        self._insert.addBatch()
+        self._pending += 1
+        if self._pending >= WRITE_BUFFER_ROWS:
+            self._insert.executeBatch()
+            self._pending = 0
+
+    def close(self):
+        try:
+            if self._pending:
+                self._insert.executeBatch()
+            statement = self._connection.createStatement()
+            try:
+                statement.executeUpdate("CREATE INDEX idx_%s_device ON %s (device_id, usb_epoch)"
+                                        % (SQLITE_TABLE, SQLITE_TABLE))
+                statement.executeUpdate("CREATE INDEX idx_%s_program_time ON %s (program_epoch)"
+                                        % (SQLITE_TABLE, SQLITE_TABLE))
+            finally:
+                statement.close()
+            self._connection.commit()
+        finally:
+            self._insert.close()
+            self._connection.close()
+
+
+# Ausgabeformate, die zusätzlich zum CSV-Bericht geschrieben werden können
+REPORT_WRITERS = {
+    "jsonl": (".jsonl", JsonLinesReportWriter),
+    "sqlite": (".sqlite", SqliteReportWriter),
+}
+
+
+# Verteilt jede Zeile auf alle gewählten Ausgaben, ohne Zeilen im Speicher zu halten
+class ReportWriters(object):
+
+    def __init__(self, csv_path, formats):
+        self.writers = [CsvReportWriter(csv_path)]
+        base_path = os.path.splitext(csv_path)[0]
+        for name in formats:
+            extension, writer_class = REPORT_WRITERS[name]
+            self.writers.append(writer_class(base_path + extension))
+
+    def write(self, row):
+        for writer in self.writers:
+            writer.write(row)
+
+    def close(self):
+        for writer in self.writers:
+            writer.close()
+
+
+# Eigene Artefakttypen des Ingest-Moduls: eine Zeile des Berichts pro BADUSB_ACTIVITY-Artefakt,
+# ein BADUSB_ANALYSIS-Artefakt pro vollständig analysierter Datenquelle
+ACTIVITY_ARTIFACT_TYPE = ("BADUSB_ACTIVITY", "BadUSB Activity")
+ANALYSIS_ARTIFACT_TYPE = ("BADUSB_ANALYSIS", "BadUSB Analysis")
+
+_VALUE_TYPE = BlackboardAttribute.TSK_BLACKBOARD_ATTRIBUTE_VALUE_TYPE
+# Lauf-ID verbindet die Zeilen eines Laufs mit seinem Analyse-Artefakt, der Fingerabdruck die Einstellungen
+RUN_ID_ATTRIBUTE_TYPE = ("BADUSB_RUN_ID", _VALUE_TYPE.STRING, "BadUSB Run ID")
+FINGERPRINT_ATTRIBUTE_TYPE = ("BADUSB_FINGERPRINT", _VALUE_TYPE.STRING, "BadUSB Settings Fingerprint")
+# Ein Attributtyp pro Berichtsspalte, Epoch-Spalten als Zeitstempel
+ACTIVITY_ATTRIBUTE_TYPES = [
+    ("BADUSB_" + key.upper(),
+     _VALUE_TYPE.DATETIME if key.endswith("_epoch") else _VALUE_TYPE.INTEGER if sql_type == "INTEGER" else _VALUE_TYPE.STRING,
+     "BadUSB " + (header or key.replace("_", " ").title()))
+    for key, sql_type, header in REPORT_COLUMNS
+]
+
+
+# Liest den Wert eines Attributs passend zu seinem Typ
+def attribute_value(attribute):
+    value_type = attribute.getAttributeType().getValueType()
+    if value_type == _VALUE_TYPE.DATETIME or value_type == _VALUE_TYPE.LONG:
+        return attribute.getValueLong()
+    if value_type == _VALUE_TYPE.INTEGER:
+        return attribute.getValueInt()
+    return attribute.getValueString()
+
+
+# Legt ein Attribut mit dem passenden Konstruktor an
+def new_attribute(attribute_type, module_name, value):
+    value_type = attribute_type.getValueType()
+    if value_type == _VALUE_TYPE.DATETIME or value_type == _VALUE_TYPE.LONG:
+        return BlackboardAttribute(attribute_type, module_name, Long(value))
+    if value_type == _VALUE_TYPE.INTEGER:
+        return BlackboardAttribute(attribute_type, module_name, Integer(value))
+    return BlackboardAttribute(attribute_type, module_name, field_text(value))
+
+
+# Ablage der Ingest-Ergebnisse auf dem Blackboard: schreibt die Berichtszeilen einer Datenquelle
+# als eigene Artefakte und liest sie beim Bericht mit einer Abfrage pro Datenquelle wieder aus
+class ActivityStore(object):
+
+    def __init__(self, sleuthkit_case, activity_type, analysis_type, attribute_types):
+        self._case = sleuthkit_case
+        self._blackboard = sleuthkit_case.getBlackboard()
+        self._activity_type = activity_type
+        self._analysis_type = analysis_type
+        self._run_id_type, self._fingerprint_type = attribute_types[:2]
+        self._column_types = attribute_types[2:]        # In der Reihenfolge von REPORT_COLUMNS
+
+    # Legt die Typen bei Bedarf an (Ingest)
+    @staticmethod
+    def create(sleuthkit_case):
+        blackboard = sleuthkit_case.getBlackboard()
+        attribute_types = [blackboard.getOrAddAttributeType(name, value_type, display_name)
+                           for name, value_type, display_name
+                           in [RUN_ID_ATTRIBUTE_TYPE, FINGERPRINT_ATTRIBUTE_TYPE] + ACTIVITY_ATTRIBUTE_TYPES]
+        return ActivityStore(sleuthkit_case,
+                             blackboard.getOrAddArtifactType(ACTIVITY_ARTIFACT_TYPE[0], ACTIVITY_ARTIFACT_TYPE[1],
+                                                             BlackboardArtifact.Category.DATA_ARTIFACT),
+                             blackboard.getOrAddArtifactType(ANALYSIS_ARTIFACT_TYPE[0], ANALYSIS_ARTIFACT_TYPE[1],
+                                                             BlackboardArtifact.Category.DATA_ARTIFACT),
+                             attribute_types)
+
+    # Sucht die vorhandenen Typen (Bericht); None, wenn das Ingest-Modul im Fall nie gelaufen ist
+    @staticmethod
+    def find(sleuthkit_case):
+        activity_type = sleuthkit_case.getArtifactType(ACTIVITY_ARTIFACT_TYPE[0])
+        analysis_type = sleuthkit_case.getArtifactType(ANALYSIS_ARTIFACT_TYPE[0])
+        attribute_types = [sleuthkit_case.getAttributeType(name) for name, _, _
+                           in [RUN_ID_ATTRIBUTE_TYPE, FINGERPRINT_ATTRIBUTE_TYPE] + ACTIVITY_ATTRIBUTE_TYPES]
+        if activity_type is None or analysis_type is None or None in attribute_types:
+            return None
+        return ActivityStore(sleuthkit_case, activity_type, analysis_type, attribute_types)
+
+    # Gibt je Datenquelle die Lauf-ID der letzten vollständigen Analyse mit passenden Einstellungen zurück
+    def completed_runs(self, fingerprint):
+        runs = {}
+        for artifact in self._blackboard.getDataArtifactsWhere(
+                "artifacts.artifact_type_id = %d" % self._analysis_type.getTypeID()):
+            values = dict((attribute.getAttributeType().getTypeID(), attribute.getValueString())
+                          for attribute in artifact.getAttributes())
+            if values.get(self._fingerprint_type.getTypeID()) == fingerprint:
+                # Bei mehreren Läufen gilt der zuletzt angelegte
+                previous = runs.get(artifact.getDataSourceObjectID())
+                if previous is None or previous[0] < artifact.getArtifactID():
+                    runs[artifact.getDataSourceObjectID()] = (artifact.getArtifactID(),
+                                                              values.get(self._run_id_type.getTypeID()))
+        return dict((data_source_id, run[1]) for data_source_id, run in runs.items())
+
+    # Schreibt die Zeilen einer Datenquelle blockweise in Transaktionen und postet jeden Block gesammelt;
+    # das Analyse-Artefakt wird zuletzt angelegt und markiert den Lauf als vollständig
+    def write(self, data_source, rows, fingerprint, module_name, ingest_job_id, is_cancelled):
+        run_id = uuid.uuid4().hex
+        run_attribute = new_attribute(self._run_id_type, module_name, run_id)
+        block = []
+        for row in rows:
+            if is_cancelled():
+                return False
+            attributes = ArrayList()
+            attributes.add(run_attribute)
+            # Leere Texte werden gespeichert, damit JSON Lines und SQLite "" statt null erhalten
+            for attribute_type, value in zip(self._column_types, row):
+                if value is not None:
+                    attributes.add(new_attribute(attribute_type, module_name, value))
+            block.append(attributes)
+            if len(block) >= WRITE_BUFFER_ROWS:
+                self._post(self._activity_type, data_source, block, module_name, ingest_job_id)
+                block = []
+        if block:
+            self._post(self._activity_type, data_source, block, module_name, ingest_job_id)
+        self._post(self._analysis_type, data_source,
+                   [Arrays.asList(run_attribute, new_attribute(self._fingerprint_type, module_name, fingerprint))],
+                   module_name, ingest_job_id)
+        return True
+
+    # Legt einen Block Artefakte in einer Transaktion an und veröffentlicht ihn mit einem Ereignis
+    def _post(self, artifact_type, data_source, block, module_name, ingest_job_id):
+        artifacts = ArrayList()
+        transaction = self._case.beginTransaction()
+        try:
+            for attributes in block:
+                artifacts.add(self._blackboard.newDataArtifact(artifact_type, data_source.getId(), data_source.getId(),
+                                                               attributes, None, transaction))
+            transaction.commit()
+        except TskCoreException:
+            transaction.rollback()
+            raise
+        self._blackboard.postArtifacts(artifacts, module_name, ingest_job_id)
+
+    # Liest die Zeilen eines Laufs in der Reihenfolge, in der sie geschrieben wurden; jede Abfrage liefert die
+    # Attribute der nächsten WRITE_BUFFER_ROWS Artefakte des Laufs, ältere Läufe werden in SQL ausgefiltert
+    def iter_rows(self, data_source_id, run_id):
+        column_index = dict((attribute_type.getTypeID(), index) for index, attribute_type in enumerate(self._column_types))
+        last_artifact_id = 0
+        while True:
+            attributes = self._case.getMatchingAttributes(
+                "WHERE artifact_id IN (SELECT artifact_id FROM blackboard_attributes"
+                " WHERE attribute_type_id = %d AND value_text = '%s' AND artifact_id > %d"
+                " AND artifact_id IN (SELECT artifact_id FROM blackboard_artifacts"
+                " WHERE artifact_type_id = %d AND data_source_obj_id = %d)"
+                " ORDER BY artifact_id LIMIT %d) ORDER BY artifact_id"
+                % (self._run_id_type.getTypeID(), run_id, last_artifact_id, self._activity_type.getTypeID(),
+                   data_source_id, WRITE_BUFFER_ROWS))
+            if not attributes:
+                return
+            row = None
+            for attribute in attributes:
+                if attribute.getArtifactID() != last_artifact_id:
+                    if row is not None:
+                        yield row
+                    row = [None] * len(REPORT_COLUMNS)
+                    last_artifact_id = attribute.getArtifactID()
+                index = column_index.get(attribute.getAttributeType().getTypeID())
+                if index is not None:
+                    row[index] = attribute_value(attribute)
+            yield row
+
+
+# Phasen in der Reihenfolge der Zusammenfassung; gemessen wird die eigene Zeit ohne verschachtelte Phasen
+RUN_PHASES = ["checkpoint", "artifact loading", "attribute reading", "sorting", "correlation", "evidence lookup",
+              "history scan", "event logs", "report writing", "posting"]
+RUN_COUNTERS = ["artifacts", "getAttributes calls", "findAllFilesWhere calls", "bytes read", "events", "rows",
+                "flagged files", "failed data sources"]
+
+
+# Misst eine Phase; die Zeit verschachtelter Phasen desselben Threads wird der inneren Phase zugerechnet
+class PhaseTimer(object):
+
+    def __init__(self, stats, name):
+        self._stats = stats
+        self._name = name
+        self._start = 0
+        self._nested = 0
+
+    def __enter__(self):
+        self._stats._active().append(self)
+        self._start = System.nanoTime()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        elapsed = System.nanoTime() - self._start
+        active = self._stats._active()
+        active.pop()
+        if active:
+            active[-1]._nested += elapsed
+        self._stats.add_time(self._name, elapsed - self._nested)
+        return False
+
+
+# Laufzeiten und Zähler eines Laufs, die Worker schreiben parallel hinein; optional mit Profiler je Thread
+class RunStatistics(object):
+
+    def __init__(self, profile=False):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._phases = {}       # Phase -> [Nanosekunden, Aufrufe]
+        self._counters = {}
+        self._profiles = [] if profile else None
+        self._notes = []        # Zusätzliche Zeilen am Ende der Zusammenfassung
+        self._started = System.nanoTime()
+
+    # Stapel der offenen Phasen des aktuellen Threads
+    def _active(self):
+        if not hasattr(self._local, "phases"):
+            self._local.phases = []
+        return self._local.phases
+
+    def phase(self, name):
+        return PhaseTimer(self, name)
+
+    def add_time(self, name, nanos):
+        with self._lock:
+            entry = self._phases.setdefault(name, [0, 0])
+            entry[0] += nanos
+            entry[1] += 1
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def note(self, line):
+        with self._lock:
+            self._notes.append(line)
+
+    # Führt eine Funktion aus, im Profilmodus mit einem eigenen Profiler für den aufrufenden Thread
+    def profiled(self, function, *args):
+        if self._profiles is None:
+            return function(*args)
+        profiler = profile_module.Profile()
+        try:
+            return profiler.runcall(function, *args)
+        finally:
+            with self._lock:
+                self._profiles.append(profiler)
+
+    # Schreibt die Profile aller Threads zusammengefasst im pstats-Format
+    def dump_profile(self, path):
+        with self._lock:
+            profiles = list(self._profiles or [])
+        if not profiles:
+            return False
+        profile_stats = pstats.Stats(profiles[0])
+        for profiler in profiles[1:]:
+            profile_stats.add(profiler)
+        profile_stats.dump_stats(path)
+        return True
+
+    # Zeilen der Zusammenfassung für das Log und die Zusammenfassungsdatei
+    def summary_lines(self):
+        with self._lock:
+            phases = dict((name, list(entry)) for name, entry in self._phases.items())
+            counters = dict(self._counters)
+            notes = list(self._notes)
+        lines = ["Total %.3f s (phase times are summed over worker threads)"
+                 % ((System.nanoTime() - self._started) / 1e9)]
+        for name in RUN_PHASES + sorted(set(phases) - set(RUN_PHASES)):
+            if name in phases:
+                lines.append("%-18s %10.3f s %8d calls" % (name, phases[name][0] / 1e9, phases[name][1]))
+        lines.append(", ".join("%s=%d" % (name, counters.get(name, 0))
+                               for name in RUN_COUNTERS + sorted(set(counters) - set(RUN_COUNTERS))))
+        return lines + notes
+
+    # Schreibt die Zusammenfassung als Textdatei neben den Bericht
+    def write_summary(self, path):
+        summary_file = codecs.open(path, "w", "utf-8")
+        try:
+            summary_file.write(u"BadUSB Run Summary\n" + u"\n".join(self.summary_lines()) + u"\n")
+        finally:
+            summary_file.close()
+
+
+# Gemeinsame, nur lesend genutzte Objekte aller Worker eines Laufs
+class AnalysisContext(object):
+
+    def __init__(self, sleuthkit_case, settings, indicators, evidence, ingest_cancelled=None, stats=None):
+        self.blackboard = sleuthkit_case.getBlackboard()
+        self.settings = settings
+        self.indicators = indicators
+        self.evidence = evidence
+        self.stats = stats if stats is not None else RunStatistics()    # Laufzeiten und Zähler des Laufs
+        self.cancelled = AtomicBoolean(False)       # Wird beim Abbruch im Berichtsdialog gesetzt
+        self._ingest_cancelled = ingest_cancelled   # Abbruchabfrage des Ingest-Jobs, falls vorhanden
+
+    # Prüft, ob der Bericht oder der Ingest-Job abgebrochen wurde
+    def is_cancelled(self):
+        return self.cancelled.get() or (self._ingest_cancelled is not None and self._ingest_cancelled())
+
+
+# Analysiert eine Datenquelle auf einem Worker-Thread: lädt neue Artefakte, korreliert Geräte
+# und Programme und ermittelt die zu markierenden Beweisdateien. Der Zustand im Checkpoint
+# wird erst nach erfolgreichem Abschluss ersetzt.
+class DataSourceAnalysis(Callable):
+
+    def __init__(self, context, data_source_id, state):
+        self.context = context
+        self.data_source_id = data_source_id
+        self.state = state
+        self.correlator = None  # Korrelation der Geräte und Programme nach erfolgreichem Abschluss
+        self.event_correlator = None    # Korrelation der Geräte und Ereignisse aus den Event Logs
+        self.flags = []         # (Datei, Begründung) in Markierungsreihenfolge
+
+    def call(self):
+        return self.context.stats.profiled(self._analyse)
+
+    def _analyse(self):
+        context = self.context
+        indicators = context.indicators
+        stats = context.stats
+        old = self.state
+        state = SourceState()
+
+        # Abfrage der Datenbank nach USB-Gerät- und Programmausführungs-Artefakten, die neuer als der Checkpoint sind
+        with stats.phase("artifact loading"):
+            usb_files = load_new_artifacts(context.blackboard, BlackboardArtifact.Type.TSK_DEVICE_ATTACHED,
+                                           self.data_source_id, old.max_device_artifact_id)
+            program_files = load_new_artifacts(context.blackboard, BlackboardArtifact.Type.TSK_PROG_RUN,
+                                               self.data_source_id, old.max_program_artifact_id)
+        stats.count("artifacts", len(usb_files) + len(program_files))
+        state.max_device_artifact_id = max_artifact_id(usb_files, old.max_device_artifact_id)
+        state.max_program_artifact_id = max_artifact_id(program_files, old.max_program_artifact_id)
+        if context.is_cancelled():
+            return self
+
+        # Liest die Attribute jedes Artefakts genau einmal in kompakte Datensätze
+        with stats.phase("attribute reading"):
+            new_programs = load_program_records(program_files)
+            new_devices = load_device_records(usb_files)
+        stats.count("getAttributes calls", len(usb_files) + len(program_files))
+        state.has_programs = old.has_programs or any(record.name for record in new_programs)
+        # Wenn Powershell in Programmausführungen gefunden wurde, werden die PowerShell-Spuren ausgewertet
+        state.has_powershell = old.has_powershell or any(
+            indicators.powershell_hosts.match(record.name_lower) for record in new_programs if record.name)
+
+        # Führt die neuen Datensätze mit dem Checkpoint zusammen; für den Bericht sind nur verdächtige
+        # Programme mit Zeitstempel relevant, Programme ohne Zeitstempel haben kein USB-Zeitfenster
+        state.devices = old.devices + [device for device in new_devices if not device.is_virtual()]
+        state.programs = old.programs + [program for program in new_programs
+                                         if program.epoch and indicators.executables.match(program.name_lower)]
+        # Stabile Sortierung: bei gleichem Zeitstempel bleiben Checkpoint-Einträge vor neuen, neue in Artefaktreihenfolge
+        with stats.phase("sorting"):
+            state.programs.sort(key=lambda record: record.epoch)
+        if context.is_cancelled():
+            return self
+
+        # Korreliert die Geräte mit den Programmausführungen derselben Datenquelle
+        with stats.phase("correlation"):
+            correlator = TimeWindowCorrelator(state.programs, context.settings["window_minutes"])
+
+        # Wertet die Beweisdateien nur aus, wenn sich der Zustand seit dem letzten Lauf geändert hat
+        evaluated = [state.has_programs, state.has_powershell]
+        state.evaluated = old.evaluated
+        state.event_logs = old.event_logs
+        if evaluated != old.evaluated:
+            self._collect_evidence(state)
+            if context.is_cancelled():
+                return self
+            state.evaluated = evaluated
+
+        # Liest die Ereignisse der markierten Event Logs; bei unveränderter Auswahl der Logs
+        # nur für die Zeitfenster neuer Geräte
+        if context.settings["event_logs"]:
+            with stats.phase("event logs"):
+                if state.event_logs == old.event_logs:
+                    state.events = self._read_events(state.event_logs, state.devices[len(old.devices):], old.events)
+                else:
+                    state.events = self._read_events(state.event_logs, state.devices, [])
+            stats.count("events", len(state.events))
+            if context.is_cancelled():
+                return self
+        self.state = state
+        self.correlator = correlator
+        with stats.phase("correlation"):
+            self.event_correlator = TimeWindowCorrelator(state.events, context.settings["window_minutes"])
+        return self
+
+    # Erzeugt die Berichtszeilen erst beim Schreiben, damit sie nicht im Speicher gehalten werden:
+    # eine Zeile pro Programmausführung im Zeitfenster, für Geräte ohne Treffer eine Zeile ohne Programm
+    def iter_rows(self):
+        correlator = self.correlator
+        if correlator is None:
+            return
+        indicators = self.context.indicators
+        stats = self.context.stats
+        for device in self.state.devices:
+            # Abfrage der Zeitfenster und Formatierung zählen zur Korrelation, nicht zum Schreiben des Berichts;
+            # gepuffert werden nur die Zeilen eines Geräts
+            with stats.phase("correlation"):
+                rows = self._device_rows(device, correlator, indicators)
+            for row in rows:
+                yield row
+
+    # Berichtszeilen eines Geräts: Programmausführungen und Ereignisse in seinem Zeitfenster
+    def _device_rows(self, device, correlator, indicators):
+        device_fields = [device.device_id, format_timestamp(device.epoch) if device.epoch else "",
+                         device.epoch or None, device.make, device.model, device.unique_path]
+        # Nur verdächtige Programmausführungen im Zeitfenster des USB-Anschlusses
+        # (ohne USB-Zeitstempel gibt es kein Zeitfenster)
+        programs = correlator.match(device.epoch) if device.epoch else []
+        # Ereignisse aus den Event Logs folgen als weitere Zeilen auf die Programmausführungen
+        events = self.event_correlator.match(device.epoch) if device.epoch else []
+        if not programs and not events:
+            return [device_fields + EMPTY_PROGRAM_FIELDS]
+        rows = []
+        for program in programs:
+            rule = indicators.executables.match(program.name_lower)
+            rows.append(device_fields + [program.name, correlator.format(program.epoch), program.epoch,
+                                         program.count if program.count != "" else None,
+                                         program.comment, program.path, u"%s" % (rule,)])
+        for event in events:
+            rows.append(device_fields + event.report_fields(self.event_correlator))
+        return rows
+
+    # Liest die relevanten Ereignisse der Event Logs im Zeitfenster der Geräte und ergänzt die bekannten
+    def _read_events(self, log_names, devices, known):
+        windows = DeviceWindows([device.epoch for device in devices if device.epoch],
+                                self.context.settings["window_minutes"])
+        if not windows or not log_names:
+            return known
+        events = list(known)
+        seen = set((event.file_id, event.record_id) for event in known)
+        for log_name in log_names:
+            display_name, event_types = EVENT_LOG_EVENTS[log_name]
+            for log_file in self.context.evidence.files(self.data_source_id, log_name):
+                try:
+                    for record_id, epoch, event_id, fields in iter_evtx_events(log_file, log_name, windows,
+                                                                               self.context.is_cancelled,
+                                                                               self.context.stats):
+                        # Ereignisse in überlappenden Fenstern alter und neuer Geräte nur einmal übernehmen
+                        if (log_file.getId(), record_id) in seen:
+                            continue
+                        seen.add((log_file.getId(), record_id))
+                        _, path_field, comment_fields = event_types[event_id]
+                        events.append(EventRecord(
+                            epoch, log_name, event_id, record_id, log_file.getId(),
+                            fields.get(path_field, u"") if path_field else u"",
+                            u"; ".join(u"%s=%s" % (name, fields[name]) for name in comment_fields if fields.get(name))))
+                except IOException:
+                    # Nicht lesbare Logdateien werden übersprungen, die Datei bleibt als Beweisdatei markiert
+                    continue
+        events.sort(key=lambda event: event.epoch)
+        return events
+
+    # Ermittelt die zu markierenden Beweisdateien der Datenquelle
+    def _collect_evidence(self, state):
+        evidence = self.context.evidence
+        data_source_id = self.data_source_id
+        state.event_logs = []
+
+        # Wenn ein verdächtiges Programm gefunden wurde, werden die Windows Event Logs Application.evtx und Security.evtx extrahiert
+        if state.has_programs:
+            state.event_logs.append(SECURITY_LOG)
+            for file in evidence.files(data_source_id, APPLICATION_LOG) + evidence.files(data_source_id, SECURITY_LOG):
+                # Markiert die Logdatei als interessant
+                self.flags.append((file, "Application und Security Logs gefunden"))
+
+        # Wenn Powershell gefunden wurde, dann werden die PowerShell Event Logs extrahiert
+        if not state.has_powershell:
+            return
+        state.event_logs.append(POWERSHELL_LOG)
+        for file in evidence.files(data_source_id, POWERSHELL_LOG):
+            # Markiert das PowerShell Event Log als interessant
+            self.flags.append((file, "Windows PowerShell Log gefunden"))
+
+        # Überprüft die PowerShell-Befehle auf Hinweise zum Deaktivieren von Windows Defender
+        powershell_defender_disabled = False
+        suspicious_rule = None     # Regel, die in der Befehlshistorie angeschlagen hat
+        ps_file = None
+
+        for ps_file in evidence.files(data_source_id, POWERSHELL_HISTORY):
+            if self.context.is_cancelled():
+                return
+            # Liest die Befehlshistorie blockweise und stoppt beim ersten Treffer
+            try:
+                with self.context.stats.phase("history scan"):
+                    suspicious_rule = find_first_indicator(ps_file, self.context.indicators.defender_tamper,
+                                                           stats=self.context.stats)
+            except IOException:
+                # Nicht lesbare Befehlshistorien werden übersprungen, die Datei wird trotzdem markiert
+                self.flags.append((ps_file, "PowerShell Befehlshistorie gefunden"))
+                continue
+            if suspicious_rule is not None:
+                powershell_defender_disabled = True
+                break
+
+        # Markiert die PowerShell-Befehlshistorie-Datei
+        if ps_file:
+            self.flags.append((ps_file, "PowerShell Befehlshistorie gefunden" +
+                               (u" (%s)" % (suspicious_rule,) if suspicious_rule else "")))
+
+        # Wenn ein Hinweis auf das Deaktivieren von Windows Defender in der PowerShell Befehlshistorie gefunden wurde
+        if powershell_defender_disabled:
+            state.event_logs.append(DEFENDER_LOG)
+            for file in evidence.files(data_source_id, DEFENDER_LOG):
+                # Markiert das Defender Event Log als interessant
+                self.flags.append((file, "Windows Defender Log gefunden"))
+
+
 # Definiert die Reportmodul-Klasse für CSV-Berichte
 class CSVReportModule(GeneralReportModuleAdapter):
     # Name des Moduls für den Bericht
@@ -30,9 +1667,9 @@ class CSVReportModule(GeneralReportModuleAdapter):
     # Log-Methode für Fehlerprotokollierung
     def log(self, level, msg):
         # Überprüft, ob der Logger bereits existiert
-        if _logger == None:
+        if CSVReportModule._logger is None:
             # Initialisiert den Logger mit dem Modulnamen
-            _logger = Logger.getLogger(self.moduleName)
+            CSVReportModule._logger = Logger.getLogger(self.moduleName)
         # Loggt die Nachricht mit der Log-Stufe und dem Stack-Trace
         self._logger.logp(level, self.__class__.__name__, inspect.stack()[1][3], msg)
 
@@ -53,294 +1690,264 @@ class CSVReportModule(GeneralReportModuleAdapter):
 
     # Hauptmethode zur Berichtserstellung
     def generateReport(self, reportSettings, progressBar):
-        # Öffnet die Ausgabedatei
+        # Lädt die Einstellungen (u.a. die Breite des Zeitfensters und die Ausgabeformate)
+        settings = load_settings()
+
+        # Misst die Phasen des Laufs, im Profilmodus zusätzlich mit einem Profiler je Thread
+        stats = RunStatistics(settings["profile"])
+        stats.profiled(self._generate, settings, stats, reportSettings, progressBar)
+
+        # Schreibt Laufzeiten und Zähler ins Autopsy-Log
+        for line in stats.summary_lines():
+            self.log(Level.INFO, line)
+        if settings["profile"]:
+            profilePath = os.path.join(reportSettings.getReportDirectoryPath(), "BadUSB_profile.pstats")
+            try:
+                if stats.dump_profile(profilePath):
+                    self.log(Level.INFO, "Profile written to " + profilePath)
+            except (IOError, OSError) as e:
+                self.log(Level.WARNING, "Error writing profile: " + str(e))
+
+    # Erstellt den Bericht; die Laufzeiten der Phasen werden in stats gesammelt
+    def _generate(self, settings, stats, reportSettings, progressBar):
+        # Öffnet die Ausgabedateien: immer den CSV-Bericht, optional JSON Lines und SQLite
         fileName = os.path.join(reportSettings.getReportDirectoryPath(), self.getRelativeFilePath())
-        # Öffnet die Datei im Schreibmodus mit UTF-8 Encoding
-        report = codecs.open(fileName, "w", "utf-8")
-
-        # Liste von verdächtigen Programmen
-        suspected_executables = [
-            "ipconfig.exe", "whoami.exe", "netstat.exe", "ping.exe",
-            "nslookup.exe", "tasklist.exe", "dir.exe",
-            "curl.exe", "wget.exe", "tar.exe", "echo.exe", "cmd.exe", "powershell.exe", "mpcmdrun.exe", "windowsterminal.exe",
-            "openconsole.exe"
-        ]
-
-        # Abfrage der Datenbank nach USB-Gerät- und Programmausführungs-Artefakten
-        sleuthkitCase = Case.getCurrentCase().getSleuthkitCase()
-        usb_files = sleuthkitCase.getBlackboardArtifacts(BlackboardArtifact.ARTIFACT_TYPE.TSK_DEVICE_ATTACHED)   # Holt USB-Artifakts
-        program_files = sleuthkitCase.getBlackboardArtifacts(BlackboardArtifact.ARTIFACT_TYPE.TSK_PROG_RUN)     # Holt Programmausführungs-Artifakte
+        report = ReportWriters(fileName, settings["formats"])
+
+        # Lädt und kompiliert die Indikatoren (verdächtige Programme, PowerShell, Defender-Manipulation)
+        indicator_sections = load_indicators(settings["indicators_file"])
+        indicators = IndicatorSet(indicator_sections)
 
-        # Sortiert die Programmausführungs-Artefakte nach Zeitstempel
-        sorted_program_files = sorted(program_files, key=lambda program_file: program_file.getAttribute(
-            BlackboardAttribute.Type(BlackboardAttribute.ATTRIBUTE_TYPE.TSK_DATETIME)).getValueLong() if program_file.getAttribute(
-            BlackboardAttribute.Type(BlackboardAttribute.ATTRIBUTE_TYPE.TSK_DATETIME)) else 0)
+        # Lädt im inkrementellen Modus den Zwischenstand des letzten Laufs
+        currentCase = Case.getCurrentCase()
+        fingerprint = analysis_fingerprint(settings, indicator_sections)
+        if settings["incremental"]:
+            with stats.phase("checkpoint"):
+                checkpoint = CorrelationCheckpoint.load(
+                    os.path.join(currentCase.getModuleDirectory(), "BadUSB", CHECKPOINT_FILE), fingerprint)
+        else:
+            checkpoint = CorrelationCheckpoint(None, fingerprint)
+        dataSources = currentCase.getDataSources()
+        checkpoint.prune(set(dataSource.getId() for dataSource in dataSources))
+
+        # Datenquellen, die das Ingest-Modul mit denselben Einstellungen analysiert hat, werden nur ausgelesen
+        sleuthkitCase = currentCase.getSleuthkitCase()
+        store = ActivityStore.find(sleuthkitCase)
+        ingested = store.completed_runs(fingerprint) if store is not None else {}
+
+        # Sucht die Beweisdateien aller Datenquellen mit einer einzigen Abfrage, erst wenn sie benötigt werden
+        context = AnalysisContext(sleuthkitCase, settings, indicators, EvidenceIndex(sleuthkitCase, stats=stats),
+                                  stats=stats)
+        # Sammelt die Markierungen und veröffentlicht sie am Ende gebündelt, bereits markierte Dateien werden übersprungen
+        flagged = InterestingFileBatch(sleuthkitCase, self.moduleName, checkpoint.flagged)
 
         # Initialisiert die Fortschrittsanzeige
         progressBar.setIndeterminate(False)                 # Setzt die Fortschrittsanzeige auf bestimmbar
         progressBar.start()                                 # Startet die Fortschrittsanzeige
-        progressBar.setMaximumProgress(len(usb_files))      # Setzt den maximalen Fortschritt auf die Anzahl der USB-Dateien
-
-        # Iteriert durch die USB-Artifakte
-        for usb_file in usb_files:
-            # Extrahiert die USB-Gerätedaten
-            device_id = ""
-            timestamp = ""
-            device_make = ""
-            device_model = ""
-            data_source = usb_file.getUniquePath()      # Holt den Pfad der Datenquelle (USB)
-
-            # Holt die Device-ID und setzt die Device-ID, falls vorhanden
-            device_id_attr = usb_file.getAttribute(
-                BlackboardAttribute.Type(BlackboardAttribute.ATTRIBUTE_TYPE.TSK_DEVICE_ID))
-            device_id = device_id_attr.getValueString() if device_id_attr else ""
-
-            # Holt den Zeitstempel und setzt den Zeitstempel, falls vorhanden
-            timestamp_attr = usb_file.getAttribute(
-                BlackboardAttribute.Type(BlackboardAttribute.ATTRIBUTE_TYPE.TSK_DATETIME))
-            timestamp = timestamp_attr.getValueLong() if timestamp_attr else ""
-            local_time = ""         # Initialisiert eine leere lokale Zeit
-
-            # Wenn der Zeitstempel vorhanden ist
-            if timestamp:
-                utc_time = Instant.ofEpochSecond(timestamp)     # Konvertiert den Zeitstempel in UTC
-                zone_id = ZoneId.of("Europe/Berlin")            # Setzt die Zeitzone auf Berlin
-                local_time = ZonedDateTime.ofInstant(utc_time, zone_id)     # Wandelt die Zeit in die lokale Zeit um
-                timestamp = local_time.format(DateTimeFormatter.ofPattern("yyyy-MM-dd HH:mm:ss.SSS"))   # Formatiert die Zeit
-
-            # Holt die Marke des Geräts und setzt die Marke, falls vorhanden
-            device_make_attr = usb_file.getAttribute(
-                BlackboardAttribute.Type(BlackboardAttribute.ATTRIBUTE_TYPE.TSK_DEVICE_MAKE))
-            device_make = device_make_attr.getValueString() if device_make_attr else ""
-
-            # Holt das Modell des Geräts und setzt das Modell, falls vorhanden
-            device_model_attr = usb_file.getAttribute(
-                BlackboardAttribute.Type(BlackboardAttribute.ATTRIBUTE_TYPE.TSK_DEVICE_MODEL))
-            device_model = device_model_attr.getValueString() if device_model_attr else ""
-
-            # Filtert virtuelle USB-Geräte heraus (ROOT_HUB und USB Tablet)
-            if "ROOT_HUB" in device_model or "USB Tablet" in device_model:
-                continue  # Überspringt dieses Gerät
-
-            # Schreibt Header für die USB-Geräteinformationen in die CSV-Datei
-            report.write("USB Device Information\n")
-            report.write("Device ID, USB Timestamp, Device Make, Device Model, Data Source\n")
-
-            # Schreibt die USB-Geräteinformationen in die CSV-Datei
-            report.write(",".join([device_id, timestamp, device_make, device_model, data_source]) + "\n")
-
-            # Schreibt den Header für die Programme aus
-            report.write("Program Executions\n")
-            report.write("Program Name, Program Timestamp, Count, Comment, Path\n")
-
-            # Vergleicht die Programmausführungszeit mit der USB-Zeit
-            # Iteriert durch die Programmausführungsdateien
-            for program_file in sorted_program_files:
-                program_name = ""
-                program_timestamp = ""
-                program_count = ""
-                program_comment = ""
-                program_path = ""
-
-                # Holt den Zeitstempel der Programmausführung und setzt den Zeitstempel
-                program_timestamp_attr = program_file.getAttribute(
-                    BlackboardAttribute.Type(BlackboardAttribute.ATTRIBUTE_TYPE.TSK_DATETIME))
-                program_timestamp_long = program_timestamp_attr.getValueLong() if program_timestamp_attr else ""
-
-                if program_timestamp_long:
-                    program_utc_time = Instant.ofEpochSecond(program_timestamp_long)            # Konvertiert den Zeitstempel in UTC
-                    program_local_time = ZonedDateTime.ofInstant(program_utc_time, zone_id)     # Wandelt in lokale Zeit um
-                    program_timestamp = program_local_time.format(DateTimeFormatter.ofPattern("yyyy-MM-dd HH:mm:ss.SSS"))   # Formatiert den Zeitstempel
-
-                # Überprüft, ob die Programmausführung innerhalb von 5 Minuten nach dem USB-Anschluss liegt
-                if local_time and abs((program_utc_time.toEpochMilli() - utc_time.toEpochMilli()) / 60000) <= 5:
-                    # Holt den Programmnamen
-                    program_name_attr = program_file.getAttribute(
-                        BlackboardAttribute.Type(BlackboardAttribute.ATTRIBUTE_TYPE.TSK_PROG_NAME))
-                    program_name = program_name_attr.getValueString() if program_name_attr else ""
-                    # Nur verdächtige Programme aufnehmen
-                    if any(exe in program_name.lower() for exe in suspected_executables):
-                        # Holt die Ausführungsanzahl
-                        program_count_attr = program_file.getAttribute(
-                            BlackboardAttribute.Type(BlackboardAttribute.ATTRIBUTE_TYPE.TSK_COUNT))
-                        program_count = program_count_attr.getValueInt() if program_count_attr else ""
-                        # Holt den Kommentar
-                        program_comment_attr = program_file.getAttribute(
-                            BlackboardAttribute.Type(BlackboardAttribute.ATTRIBUTE_TYPE.TSK_COMMENT))
-                        program_comment = program_comment_attr.getValueString() if program_comment_attr else ""
-                        # Holt den Pfad des Programms
-                        program_path_attr = program_file.getAttribute(
-                            BlackboardAttribute.Type(BlackboardAttribute.ATTRIBUTE_TYPE.TSK_PATH))
-                        program_path = program_path_attr.getValueString() if program_path_attr else ""
-                        # Schreibt die Programmausführungsdaten in die CSV-Datei
-                        report.write(",".join([program_name, program_timestamp, str(program_count), program_comment, program_path]) + "\n")
-
-            # Erhöht den Fortschritt der Fortschrittsanzeige für die Ausführung
-            progressBar.increment()
-
-        # Durchsucht die Programmausführungs-Artefakte nach verdächtigen Programmen
-        sus_programs_found = False
-        for program_file in sorted_program_files:
-            # Holt den Programmnamen des Programms aus den Artefakten
-            program_name_attr = program_file.getAttribute(
-                BlackboardAttribute.Type(BlackboardAttribute.ATTRIBUTE_TYPE.TSK_PROG_NAME))
-
-            if program_name_attr:
-                sus_programs_found = True
-                break  # Wenn ein verdächtiges Programm gefunden wurde, keine weiteren Programme durchsuchen
+        progressBar.setMaximumProgress(len(dataSources))    # Setzt den maximalen Fortschritt auf die Anzahl der Datenquellen
 
-        # Wenn ein verdächtiges Programm gefunden wurde, werden die Windows Event Logs Application.evtx und Security.evtx extrahiert
-        if sus_programs_found:
-            blackboard = Case.getCurrentCase().getSleuthkitCase().getBlackboard()    # Holt das Blackboard der aktuellen Fallinstanz
-            dataSources = Case.getCurrentCase().getDataSources()                    # Holt die Datenquellen des Falls
-            fileManager = Case.getCurrentCase().getServices().getFileManager()      # Holt den Dateimanager
-
-            # Durchsucht jede Datenquelle nach spezifischen Windows Event Logs (Anwendungs- und Sicherheitslogs)
-            for dataSource in dataSources:
-                files = fileManager.findFiles(dataSource, "Application.evtx",
-                                              "/Windows/System32/winevt/Logs")
-                files2 = fileManager.findFiles(dataSource, "Security.evtx",
-                                              "/Windows/System32/winevt/Logs")
-            # Verarbeitet alle gefundenen Logdateien (Anwendungs- und Sicherheitslogs)
-            for file in files + files2:
-                # Erstellt ein Artefakt für die Event Logs und markiert es als interessant
-                attrs = Arrays.asList(BlackboardAttribute(BlackboardAttribute.Type.TSK_SET_NAME,
-                                                          CSVReportModule.moduleName,
-                                                          "BadUSB: Event Logs und Datei-Analyse"))
-                art = file.newAnalysisResult(BlackboardArtifact.Type.TSK_INTERESTING_FILE_HIT,
-                                             Score.SCORE_LIKELY_NOTABLE,
-                                             None, "Application und Security Logs gefunden", None, attrs).getAnalysisResult()
+        # Namen der Datenquellen, deren Analyse fehlgeschlagen ist; ihre Zeilen fehlen im Bericht
+        failed = []
 
-                try:
-                    # Postet das Artefakt auf das Blackboard
-                    blackboard.postArtifact(art, CSVReportModule.moduleName, None)
-                except Blackboard.BlackboardException as e:
-                    # Fehlerbehandlung beim Posten des Artefakts
-                    self.log(Level.SEVERE, "Error indexing artifact " + art.getDisplayName())
-
-        # Wenn Powershell in Programmausführungen gefunden wurde, wird das entsprechende Artefakt für PowerShell.evtx erstellt
-        powershell_found = False
-        # Durchsucht alle Programme in Programmausführungen nach Powershell
-        for program_file in sorted_program_files:
-            program_name = ""
-            # Holt den Programmnamen
-            program_name_attr = program_file.getAttribute(
-                BlackboardAttribute.Type(BlackboardAttribute.ATTRIBUTE_TYPE.TSK_PROG_NAME))
-            program_name = program_name_attr.getValueString() if program_name_attr else ""
-
-            # Überprüft, ob der Programname "powershell" enthält
-            if "powershell" in program_name.lower():
-                powershell_found = True     # Markiert Powershell als gefunden
-                break   # Keine weiteren Programme durchsuchen, wenn Powershell gefunden wurde
+        # Verteilt die Analyse der Datenquellen auf einen begrenzten Thread-Pool
+        workers = settings["workers"] or Runtime.getRuntime().availableProcessors()
+        executor = Executors.newFixedThreadPool(max(1, min(workers, len(dataSources))))
+        try:
+            tasks = [None if dataSource.getId() in ingested else
+                     DataSourceAnalysis(context, dataSource.getId(), checkpoint.source(dataSource.getId()))
+                     for dataSource in dataSources]
+            futures = [executor.submit(task) if task is not None else None for task in tasks]
 
-        # Wenn Powershell gefunden wurde, dann werden die PowerShell Event Logs extrahiert
-        if powershell_found:
-            blackboard = Case.getCurrentCase().getSleuthkitCase().getBlackboard()
-            dataSources = Case.getCurrentCase().getDataSources()
-            fileManager = Case.getCurrentCase().getServices().getFileManager()
-
-            # Durchsucht die Datenquellen nach dem PowerShell Event Log
-            for dataSource in dataSources:
-                files = fileManager.findFiles(dataSource, "Windows PowerShell.evtx",
-                                              "/Windows/System32/winevt/Logs")
-
-            # Verarbeitet alle gefundenen PowerShell Event Logdateien
-            for file in files:
-                # Erstellt ein Artefakt für das PowerShell Event Log und markiert es als interessant
-                attrs = Arrays.asList(BlackboardAttribute(BlackboardAttribute.Type.TSK_SET_NAME,
-                                                          CSVReportModule.moduleName,
-                                                          "BadUSB: Event Logs und Datei-Analyse"))
-                art = file.newAnalysisResult(BlackboardArtifact.Type.TSK_INTERESTING_FILE_HIT,
-                                             Score.SCORE_LIKELY_NOTABLE,
-                                             None, "Windows PowerShell Log gefunden", None, attrs).getAnalysisResult()
+            # Der Bericht wird nur hier und in der festen Reihenfolge der Datenquellen geschrieben,
+            # damit er unabhängig von der Anzahl der Worker identisch ist
+            for dataSource, task, future in zip(dataSources, tasks, futures):
+                # Ergebnisse des Ingest-Moduls werden direkt in die Ausgaben gestreamt
+                if task is None:
+                    progressBar.updateStatusLabel("Reading ingest results of " + dataSource.getName())
+                    rows = 0
+                    with stats.phase("report writing"):
+                        for row in store.iter_rows(dataSource.getId(), ingested[dataSource.getId()]):
+                            report.write(row)
+                            rows += 1
+                    stats.count("rows", rows)
+                    progressBar.increment()
+                    continue
 
+                progressBar.updateStatusLabel("Analyzing " + dataSource.getName())
+                if not self._await(future, progressBar):
+                    # Abbruch im Berichtsdialog: Worker stoppen, Checkpoint und Markierungen verwerfen
+                    context.cancelled.set(True)
+                    executor.shutdownNow()
+                    report.close()
+                    return
                 try:
-                    # Postet das PowerShell Artefakt auf das Blackboard
-                    blackboard.postArtifact(art, CSVReportModule.moduleName, None)
-                except Blackboard.BlackboardException as e:
-                    # Fehlerbehandlung beim Posten des Artefakts
-                    self.log(Level.SEVERE, "Error indexing artifact " + art.getDisplayName())
-
-            # Liste der relevanten PowerShell-Befehle
-            defender_commands = [
-                "Set-MpPreference -DisableRealtimeMonitoring",
-                "Set-MpPreference -DisableBehaviorMonitoring",
-                "Set-MpPreference -DisableBlockAtFirstSeen",
-            ]
-
-            # Überprüft die PowerShell-Befehle auf Hinweise zum Deaktivieren von Windows Defender
-            powershell_defender_disabled = False
-            powershell_files = fileManager.findFiles(dataSource, "ConsoleHost_history.txt",
-                                                     "/Users/%/AppData/Roaming/Microsoft/Windows/PowerShell/PSReadLine")
-
-            suspicious_ps_file = None  # Variable, um die Datei zu speichern, die den verdächtigen Befehl enthält
-
-            for ps_file in powershell_files:
-                # Holen des Raw-Dateiinhalts
-                rawFile = ReadContentInputStream(ps_file)
-                fileBuffer = jarray.zeros(ps_file.getSize(), "b")  # Erstelle ein Byte-Array entsprechend der Dateigröße
-                filebytes = rawFile.read(fileBuffer)  # Lese die Datei in das Byte-Array
-
-                # Entferne die ersten 2 ungültigen Werte (-1, -2) aus dem Byte-Array
-                byte_array = fileBuffer[2:]
-
-                # Umwandlung der Bytes in einen lesbaren String
-                content = ""
-                for byte in byte_array:
-                    content += chr(byte)
-
-                # Ersetze Null-Bytes (wenn vorhanden)
-                content = content.replace('\x00', '')
-                for command in defender_commands:
-                    if command in content:
-                        powershell_defender_disabled = True
-                        suspicious_ps_file = ps_file
-                        break
-                if powershell_defender_disabled:
-                    break
-
-            # Poste die PowerShell-Befehlshistorie-Datei auf das Blackboard
-            if ps_file:
-                attrs = Arrays.asList(BlackboardAttribute(BlackboardAttribute.Type.TSK_SET_NAME,
-                                                          CSVReportModule.moduleName,
-                                                          "BadUSB: Event Logs und Datei-Analyse"))
-                art = ps_file.newAnalysisResult(BlackboardArtifact.Type.TSK_INTERESTING_FILE_HIT,
-                                                           Score.SCORE_LIKELY_NOTABLE,
-                                                           None,
-                                                           "PowerShell Befehlshistorie gefunden",
-                                                           None, attrs).getAnalysisResult()
+                    future.get()
+                except ExecutionException as e:
+                    self.log(Level.SEVERE, "Error analyzing data source " + dataSource.getName() + ": " + str(e.getCause()))
+                    failed.append(dataSource.getName())
+                    stats.count("failed data sources")
+                    # Der Zustand wird beim nächsten Lauf vollständig neu aufgebaut
+                    del checkpoint.sources[task.data_source_id]
+                    progressBar.increment()
+                    continue
+                checkpoint.sources[task.data_source_id] = task.state
+
+                # Streamt die Zeilen der Datenquelle in alle Ausgaben (die Zeitfenster werden dabei abgefragt)
+                rows = 0
+                with stats.phase("report writing"):
+                    for row in task.iter_rows():
+                        report.write(row)
+                        rows += 1
+                stats.count("rows", rows)
+
+                for evidence_file, justification in task.flags:
+                    flagged.add(evidence_file, justification)
+
+                # Erhöht den Fortschritt der Fortschrittsanzeige für die Datenquelle
+                progressBar.increment()
+        finally:
+            executor.shutdown()
+
+        # Legt alle Markierungen an und postet sie gemeinsam auf das Blackboard
+        try:
+            with stats.phase("posting"):
+                stats.count("flagged files", len(flagged.flush()))
+        except (TskCoreException, BlackboardException) as e:
+            # Fehlerbehandlung beim Posten der Artefakte
+            self.log(Level.SEVERE, "Error posting interesting file artifacts: " + str(e))
+            # Beim nächsten Lauf werden alle Datenquellen erneut ausgewertet
+            for state in checkpoint.sources.values():
+                state.evaluated = None
+
+        # Speichert den Zwischenstand für den nächsten inkrementellen Lauf
+        try:
+            with stats.phase("checkpoint"):
+                checkpoint.save()
+        except (IOError, OSError) as e:
+            self.log(Level.WARNING, "Error saving correlation checkpoint: " + str(e))
+
+        report.close()      # Schließt den Bericht und die Dateien
+
+        # Fügt die Berichte zum Fall hinzu, damit sie im Baum angezeigt werden; ein unvollständiger Bericht
+        # nennt die fehlenden Datenquellen schon in der Beschreibung
+        description = "BadUSB Activity Investigation Report"
+        if failed:
+            description += " (incomplete, analysis failed for: " + ", ".join(failed) + ")"
+            stats.note("Failed data sources: " + ", ".join(failed))
+        for writer in report.writers:
+            currentCase.addReport(writer.path, self.moduleName, description)
+
+        # Schreibt auf Wunsch die Laufzeiten und Zähler als Zusammenfassung neben den Bericht
+        if settings["run_summary"]:
+            summaryPath = os.path.splitext(fileName)[0] + "_summary.txt"
+            try:
+                stats.write_summary(summaryPath)
+                currentCase.addReport(summaryPath, self.moduleName, "BadUSB Run Summary")
+            except (IOError, OSError) as e:
+                self.log(Level.WARNING, "Error writing run summary: " + str(e))
+        # Setzt den Fortschritt auf abgeschlossen, bei fehlgeschlagenen Datenquellen auf Fehler
+        if failed:
+            progressBar.updateStatusLabel("Analysis failed for " + ", ".join(failed) + ", see the log for details")
+            progressBar.complete(ReportStatus.ERROR)
+        else:
+            progressBar.complete(ReportStatus.COMPLETE)
+
+    # Wartet auf einen Worker und prüft dabei regelmäßig, ob der Bericht abgebrochen wurde
+    def _await(self, future, progressBar):
+        while True:
+            if progressBar.getStatus() == ReportStatus.CANCELED:
+                return False
+            try:
+                future.get(CANCEL_POLL_MILLIS, TimeUnit.MILLISECONDS)
+                return True
+            except TimeoutException:
+                continue
+            except ExecutionException:
+                return True
+
+
+# Factory des Ingest-Moduls: korreliert USB-Geräte und Programmausführungen einmal pro Datenquelle,
+# damit der Bericht die Ergebnisse nur noch auslesen muss. Das Modul muss in der Ingest-Pipeline
+# nach Recent Activity laufen, das die Geräte- und Programmartefakte erzeugt.
+class BadUSBIngestModuleFactory(IngestModuleFactoryAdapter):
+    # Name des Moduls in der Ingest-Auswahl
+    moduleName = CSVReportModule.moduleName
+
+    def getModuleDisplayName(self):
+        return self.moduleName
+
+    def getModuleDescription(self):
+        return "Correlates USB device attachments with program executions and marks relevant " \
+               "Windows Event Logs and PowerShell histories as interesting files. " \
+               "Run after Recent Activity so the BadUSB report can read out the stored results."
+
+    def getModuleVersionNumber(self):
+        return "1.0"
+
+    def isDataSourceIngestModuleFactory(self):
+        return True
+
+    def createDataSourceIngestModule(self, ingestOptions):
+        return BadUSBIngestModule()
+
+
+# Ingest-Modul für eine Datenquelle, verwendet dieselbe Analyse wie der Bericht
+class BadUSBIngestModule(DataSourceIngestModule):
+    _logger = None
+
+    # Log-Methode für Fehlerprotokollierung
+    def log(self, level, msg):
+        if BadUSBIngestModule._logger is None:
+            BadUSBIngestModule._logger = Logger.getLogger(CSVReportModule.moduleName)
+        BadUSBIngestModule._logger.logp(level, self.__class__.__name__, inspect.stack()[1][3], msg)
+
+    def startUp(self, context):
+        self.context = context
+        # Einstellungen und Indikatoren werden einmal pro Ingest-Job geladen
+        self.settings = load_settings()
+        indicator_sections = load_indicators(self.settings["indicators_file"])
+        self.indicators = IndicatorSet(indicator_sections)
+        self.fingerprint = analysis_fingerprint(self.settings, indicator_sections)
+
+    def process(self, dataSource, progressBar):
+        progressBar.switchToIndeterminate()
+        sleuthkitCase = Case.getCurrentCase().getSleuthkitCase()
+        moduleName = CSVReportModule.moduleName
+        is_cancelled = self.context.dataSourceIngestIsCancelled
+        try:
+            store = ActivityStore.create(sleuthkitCase)
+            # Eine Datenquelle, die mit denselben Einstellungen bereits analysiert wurde, wird übersprungen
+            if dataSource.getId() in store.completed_runs(self.fingerprint):
+                return IngestModule.ProcessResult.OK
+
+            # Analysiert die Datenquelle vollständig, ohne Checkpoint des Berichts
+            stats = RunStatistics(self.settings["profile"])
+            context = AnalysisContext(sleuthkitCase, self.settings, self.indicators,
+                                      EvidenceIndex(sleuthkitCase, dataSource.getId(), stats), is_cancelled, stats)
+            analysis = DataSourceAnalysis(context, dataSource.getId(), SourceState())
+            analysis.call()
+            if is_cancelled():
+                return IngestModule.ProcessResult.OK
+
+            # Speichert die Berichtszeilen und markiert die Beweisdateien
+            if not store.write(dataSource, analysis.iter_rows(), self.fingerprint, moduleName,
+                               self.context.getJobId(), is_cancelled):
+                return IngestModule.ProcessResult.OK
+            flagged = InterestingFileBatch(sleuthkitCase, moduleName, ingest_job_id=self.context.getJobId())
+            for evidence_file, justification in analysis.flags:
+                flagged.add(evidence_file, justification)
+            with stats.phase("posting"):
+                stats.count("flagged files", len(flagged.flush()))
+            for line in stats.summary_lines():
+                self.log(Level.INFO, dataSource.getName() + ": " + line)
+            if self.settings["profile"]:
+                profilePath = os.path.join(Case.getCurrentCase().getModuleDirectory(),
+                                           "BadUSB_ingest_%d.pstats" % dataSource.getId())
                 try:
-                    blackboard.postArtifact(art, CSVReportModule.moduleName, None)
-                except Blackboard.BlackboardException as e:
-                    self.log(Level.SEVERE, "Error indexing artifact " + art.getDisplayName())
-
-            # Wenn ein Hinweis auf das Deaktivieren von Windows Defender in der PowerShell Befehlshistorie gefunden wurde
-            if powershell_defender_disabled:
-                blackboard = Case.getCurrentCase().getSleuthkitCase().getBlackboard()
-                dataSources = Case.getCurrentCase().getDataSources()
-                fileManager = Case.getCurrentCase().getServices().getFileManager()
-
-                # Suche nach Windows Defender Event Logs
-                for dataSource in dataSources:
-                    files = fileManager.findFiles(dataSource, "Microsoft-Windows-Windows Defender%4Operational.evtx",
-                                                  "/Windows/System32/winevt/Logs")
-
-                for file in files:
-                    # Erstellt ein Artefakt für das Defender Event Log
-                    attrs = Arrays.asList(BlackboardAttribute(BlackboardAttribute.Type.TSK_SET_NAME,
-                                                              CSVReportModule.moduleName,
-                                                              "BadUSB: Event Logs und Datei-Analyse"))
-                    art = file.newAnalysisResult(BlackboardArtifact.Type.TSK_INTERESTING_FILE_HIT,
-                                                 Score.SCORE_LIKELY_NOTABLE,
-                                                 None, "Windows Defender Log gefunden", None, attrs).getAnalysisResult()
-                    try:
-                        blackboard.postArtifact(art, CSVReportModule.moduleName, None)
-                    except Blackboard.BlackboardException as e:
-                        self.log(Level.SEVERE, "Error indexing artifact " + art.getDisplayName())
-
-        report.close()      # Schließt den Bericht und die Datei
-
-        # Fügt den Bericht zum Fall hinzu, damit er im Baum angezeigt wird
-        Case.getCurrentCase().addReport(fileName, self.moduleName, "BadUSB Activity Investigation Report")
-        # Setzt den Fortschritt auf abgeschlossen
-        progressBar.complete(ReportStatus.COMPLETE)
+                    stats.dump_profile(profilePath)
+                except (IOError, OSError) as e:
+                    self.log(Level.WARNING, "Error writing profile: " + str(e))
+        except (TskCoreException, BlackboardException) as e:
+            self.log(Level.SEVERE, "Error analyzing data source " + dataSource.getName() + ": " + str(e))
+            return IngestModule.ProcessResult.ERROR
+        return IngestModule.ProcessResult.OK
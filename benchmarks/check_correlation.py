@@ -0,0 +1,65 @@
+# coding=utf-8
+# Prüft, dass TimeWindowCorrelator.match und DeviceWindows.contains genau die Programme liefern,
+# die der ursprüngliche Vergleich abs((Programm_ms - USB_ms) / 60000) <= N auswählt.
+#
+#   python benchmarks/check_correlation.py
+#
+# Unter Jython ist "/" für Ganzzahlen eine Ganzzahldivision (abgerundet), hier als "//" nachgebildet.
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import fake_autopsy
+fake_autopsy.install()
+import PlugInBadUSBAnalysis as plugin
+
+USB_EPOCH = 1700000000
+WINDOWS = [1, plugin.DEFAULT_WINDOW_MINUTES, 30]
+
+
+# Der Vergleich aus der Schleife vor dem Zeitfenster-Join
+def baseline_match(usb_epoch, program_epoch, window_minutes):
+    return abs((program_epoch * 1000 - usb_epoch * 1000) // 60000) <= window_minutes
+
+
+# Abstände in Sekunden: die Grenzen -N·60-1, -N·60, (N+1)·60-1, (N+1)·60 und jede Sekunde dazwischen
+def offsets(window_minutes):
+    boundaries = [-window_minutes * 60 - 1, -window_minutes * 60,
+                  (window_minutes + 1) * 60 - 1, (window_minutes + 1) * 60]
+    return boundaries, range(-(window_minutes + 2) * 60, (window_minutes + 3) * 60)
+
+
+def check(window_minutes):
+    boundaries, sweep = offsets(window_minutes)
+    failures = []
+    for offset in list(boundaries) + list(sweep):
+        program = plugin.ProgramRecord(USB_EPOCH + offset, "tool.exe", "", "", "", 1)
+        expected = baseline_match(USB_EPOCH, program.epoch, window_minutes)
+        correlator = plugin.TimeWindowCorrelator([program], window_minutes)
+        matched = program in correlator.match(USB_EPOCH)
+        contained = plugin.DeviceWindows([USB_EPOCH], window_minutes).contains(program.epoch)
+        if matched != expected or contained != expected:
+            failures.append("N=%d offset=%+ds: baseline=%s match=%s contains=%s"
+                            % (window_minutes, offset, expected, matched, contained))
+    # Die vier Grenzen ausdrücklich: nur -N·60 und (N+1)·60-1 liegen im Fenster
+    if [baseline_match(USB_EPOCH, USB_EPOCH + offset, window_minutes) for offset in boundaries] \
+            != [False, True, True, False]:
+        failures.append("N=%d: unexpected baseline boundaries" % window_minutes)
+    return failures
+
+
+def main():
+    failures = []
+    for window_minutes in WINDOWS:
+        failures.extend(check(window_minutes))
+    for failure in failures:
+        print(failure)
+    print("time window check: %s (N = %s)" % ("FAILED" if failures else "ok", ", ".join(map(str, WINDOWS))))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
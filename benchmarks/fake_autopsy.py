@@ -0,0 +1,1023 @@
+# coding=utf-8
+# Lokaler Ersatz für die Java-, Autopsy- und Sleuth-Kit-Klassen, die das BadUSB-Modul verwendet,
+# damit das Plugin unter CPython gegen synthetische Fälle gemessen werden kann.
+# Nachgebildet wird nur, was das Plugin tatsächlich aufruft; alle Datenbankzugriffe werden gezählt.
+import os
+import re
+import struct
+import sys
+import threading
+import time
+import types
+from collections import Counter
+from concurrent import futures
+from datetime import datetime, timezone
+from random import Random
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    ZoneInfo = None
+
+
+# Zähler aller Zugriffe auf die nachgebildete Fall-Datenbank und das Dateisystem
+class CallCounter(object):
+
+    def __init__(self):
+        self._lock = threading.Lock()   # Die Worker des Plugins zählen parallel
+        self._counts = Counter()
+
+    def add(self, name, amount=1):
+        with self._lock:
+            self._counts[name] += amount
+
+    def snapshot(self):
+        with self._lock:
+            return Counter(self._counts)
+
+
+CALLS = CallCounter()
+
+
+# --- java.lang, java.io, java.sql, java.util ---
+
+class Class(object):
+
+    @staticmethod
+    def forName(name):
+        raise RuntimeError("JDBC driver %s is not available in the benchmark" % name)
+
+
+class DriverManager(object):
+    pass
+
+
+class System(object):
+    nanoTime = staticmethod(time.perf_counter_ns)
+
+
+class Runtime(object):
+
+    @staticmethod
+    def getRuntime():
+        return Runtime()
+
+    def availableProcessors(self):
+        return os.cpu_count() or 1
+
+
+Integer = int
+Long = int
+
+
+class IOException(Exception):
+    pass
+
+
+class Level(object):
+    SEVERE = "SEVERE"
+    WARNING = "WARNING"
+    INFO = "INFO"
+    FINE = "FINE"
+
+
+class ArrayList(list):
+
+    def add(self, item):
+        self.append(item)
+        return True
+
+    def size(self):
+        return len(self)
+
+
+class Arrays(object):
+
+    @staticmethod
+    def asList(*items):
+        return ArrayList(items)
+
+
+# --- java.util.concurrent ---
+
+class Callable(object):
+    pass
+
+
+class ExecutionException(Exception):
+
+    def __init__(self, cause):
+        Exception.__init__(self, str(cause))
+        self._cause = cause
+
+    def getCause(self):
+        return self._cause
+
+
+class TimeoutException(Exception):
+    pass
+
+
+class TimeUnit(object):
+    MILLISECONDS = 0.001            # Faktor nach Sekunden
+    SECONDS = 1.0
+
+
+class AtomicBoolean(object):
+
+    def __init__(self, value=False):
+        self._value = value
+
+    def get(self):
+        return self._value
+
+    def set(self, value):
+        self._value = value
+
+
+class Future(object):
+
+    def __init__(self, future):
+        self._future = future
+
+    def get(self, timeout=None, unit=TimeUnit.SECONDS):
+        try:
+            return self._future.result(None if timeout is None else timeout * unit)
+        except futures.TimeoutError:
+            raise TimeoutException()
+        except Exception as e:
+            raise ExecutionException(e)
+
+
+class ExecutorService(object):
+
+    def __init__(self, threads):
+        self._pool = futures.ThreadPoolExecutor(threads)
+
+    def submit(self, task):
+        return Future(self._pool.submit(task.call))
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+    def shutdownNow(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class Executors(object):
+
+    @staticmethod
+    def newFixedThreadPool(threads):
+        return ExecutorService(threads)
+
+
+# --- java.time ---
+
+class Instant(object):
+
+    @staticmethod
+    def ofEpochSecond(seconds):
+        return datetime.fromtimestamp(seconds, timezone.utc)
+
+
+class ZoneId(object):
+
+    @staticmethod
+    def of(name):
+        return ZoneInfo(name) if ZoneInfo is not None else timezone.utc
+
+
+class DateTimeFormatter(object):
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+
+    @staticmethod
+    def ofPattern(pattern):
+        return DateTimeFormatter(pattern)
+
+
+class ZonedDateTime(object):
+
+    def __init__(self, value):
+        self._value = value
+
+    @staticmethod
+    def ofInstant(instant, zone):
+        return ZonedDateTime(instant.astimezone(zone))
+
+    # Unterstützt die Musterelemente, die das Plugin verwendet
+    def format(self, formatter):
+        text = formatter.pattern
+        for token, value in (("yyyy", "%04d" % self._value.year), ("SSS", "%03d" % (self._value.microsecond // 1000)),
+                             ("MM", "%02d" % self._value.month), ("dd", "%02d" % self._value.day),
+                             ("HH", "%02d" % self._value.hour), ("mm", "%02d" % self._value.minute),
+                             ("ss", "%02d" % self._value.second)):
+            text = text.replace(token, value)
+        return text
+
+
+# --- jarray ---
+
+class ByteArray(bytearray):
+
+    def tostring(self):
+        return bytes(self)
+
+    def __getitem__(self, key):
+        value = bytearray.__getitem__(self, key)
+        return ByteArray(value) if isinstance(key, slice) else value
+
+
+def zeros(length, type_code):
+    return ByteArray(length)
+
+
+# --- Sleuth Kit: Datenmodell ---
+
+class TskData(object):
+    pass
+
+
+class TskCoreException(Exception):
+    pass
+
+
+class BlackboardException(Exception):
+    pass
+
+
+class Score(object):
+    SCORE_LIKELY_NOTABLE = "LIKELY_NOTABLE"
+
+
+class ValueType(object):
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return self.name
+
+
+class AttributeType(object):
+
+    def __init__(self, type_id, name, value_type, display_name):
+        self._type_id = type_id
+        self._name = name
+        self._value_type = value_type
+        self._display_name = display_name
+
+    def getTypeID(self):
+        return self._type_id
+
+    def getTypeName(self):
+        return self._name
+
+    def getValueType(self):
+        return self._value_type
+
+
+class ArtifactType(object):
+
+    def __init__(self, type_id, name, display_name, category):
+        self._type_id = type_id
+        self._name = name
+        self._display_name = display_name
+        self._category = category
+
+    def getTypeID(self):
+        return self._type_id
+
+    def getTypeName(self):
+        return self._name
+
+
+class _AttributeTypes(object):
+    pass
+
+
+class BlackboardAttribute(object):
+    TSK_BLACKBOARD_ATTRIBUTE_VALUE_TYPE = _AttributeTypes()
+    for _name in ("STRING", "INTEGER", "LONG", "DOUBLE", "BYTE", "DATETIME", "JSON"):
+        setattr(TSK_BLACKBOARD_ATTRIBUTE_VALUE_TYPE, _name, ValueType(_name))
+    _VT = TSK_BLACKBOARD_ATTRIBUTE_VALUE_TYPE
+
+    # Standardtypen mit den IDs aus dem Sleuth-Kit-Schema
+    ATTRIBUTE_TYPE = _AttributeTypes()
+    Type = ATTRIBUTE_TYPE
+    for _name, _type_id, _value_type in (("TSK_PATH", 8, _VT.STRING), ("TSK_PROG_NAME", 4, _VT.STRING),
+                                         ("TSK_COMMENT", 16, _VT.STRING), ("TSK_SET_NAME", 37, _VT.STRING),
+                                         ("TSK_DATETIME", 33, _VT.DATETIME), ("TSK_COUNT", 67, _VT.INTEGER),
+                                         ("TSK_DEVICE_MODEL", 82, _VT.STRING), ("TSK_DEVICE_MAKE", 83, _VT.STRING),
+                                         ("TSK_DEVICE_ID", 84, _VT.STRING)):
+        setattr(ATTRIBUTE_TYPE, _name, AttributeType(_type_id, _name, _value_type, _name))
+    del _name, _type_id, _value_type
+
+    def __init__(self, attribute_type, module_name, value):
+        self._type = attribute_type
+        self._module_name = module_name
+        self._value = value
+        self._artifact_id = None
+
+    def getAttributeType(self):
+        return self._type
+
+    def getValueString(self):
+        return self._value
+
+    def getValueInt(self):
+        return self._value
+
+    def getValueLong(self):
+        return self._value
+
+    def getArtifactID(self):
+        return self._artifact_id
+
+
+class _ArtifactTypes(object):
+    pass
+
+
+class BlackboardArtifact(object):
+    Category = _ArtifactTypes()
+    Category.DATA_ARTIFACT = "DATA_ARTIFACT"
+    Category.ANALYSIS_RESULT = "ANALYSIS_RESULT"
+
+    Type = _ArtifactTypes()
+    Type.TSK_PROG_RUN = ArtifactType(8, "TSK_PROG_RUN", "Run Programs", Category.DATA_ARTIFACT)
+    Type.TSK_DEVICE_ATTACHED = ArtifactType(11, "TSK_DEVICE_ATTACHED", "USB Device Attached", Category.DATA_ARTIFACT)
+    Type.TSK_INTERESTING_FILE_HIT = ArtifactType(3, "TSK_INTERESTING_FILE_HIT", "Interesting Files",
+                                                 Category.ANALYSIS_RESULT)
+
+
+# Artefakt oder Analyseergebnis in der nachgebildeten Datenbank
+class Artifact(object):
+
+    def __init__(self, artifact_id, artifact_type, object_id, data_source_id, attributes, configuration=None):
+        self._artifact_id = artifact_id
+        self._type = artifact_type
+        self._object_id = object_id
+        self._data_source_id = data_source_id
+        self._configuration = configuration
+        # Wie in der Datenbank werden die Werte gespeichert, nicht die übergebenen Objekte
+        self._attributes = [BlackboardAttribute(attribute.getAttributeType(), attribute._module_name,
+                                                attribute._value) for attribute in attributes]
+        for attribute in self._attributes:
+            attribute._artifact_id = artifact_id
+
+    def getArtifactID(self):
+        return self._artifact_id
+
+    def getArtifactTypeID(self):
+        return self._type.getTypeID()
+
+    def getObjectID(self):
+        return self._object_id
+
+    def getDataSourceObjectID(self):
+        return self._data_source_id
+
+    def getUniquePath(self):
+        CALLS.add("getUniquePath")
+        return "/img_%d/vol_vol2" % self._data_source_id
+
+    def getConfiguration(self):
+        return self._configuration
+
+    def getAttributes(self):
+        CALLS.add("getAttributes")
+        return list(self._attributes)
+
+    def getAttribute(self, attribute_type):
+        CALLS.add("getAttribute")
+        for attribute in self._attributes:
+            if attribute.getAttributeType().getTypeID() == attribute_type.getTypeID():
+                return attribute
+        return None
+
+    # Ergebnis von newAnalysisResult
+    def getAnalysisResult(self):
+        return self
+
+
+# Datei im Image; der Inhalt liegt im Speicher und wird nur über ReadContentInputStream gelesen
+class AbstractFile(object):
+
+    def __init__(self, file_id, data_source_id, name, parent_path, data):
+        self._file_id = file_id
+        self._data_source_id = data_source_id
+        self._name = name
+        self._parent_path = parent_path
+        self._data = data
+
+    def getId(self):
+        return self._file_id
+
+    def getName(self):
+        return self._name
+
+    def getParentPath(self):
+        return self._parent_path
+
+    def getDataSourceObjectId(self):
+        return self._data_source_id
+
+    def getSize(self):
+        return len(self._data)
+
+
+class ReadContentInputStream(object):
+
+    def __init__(self, content):
+        self._data = content._data
+        self._position = 0
+        CALLS.add("ReadContentInputStream")
+
+    def read(self, buffer, offset=0, length=None):
+        if length is None:
+            length = len(buffer) - offset
+        chunk = self._data[self._position:self._position + length]
+        if not chunk:
+            return -1
+        buffer[offset:offset + len(chunk)] = chunk
+        self._position += len(chunk)
+        CALLS.add("stream.read")
+        CALLS.add("bytes read", len(chunk))
+        return len(chunk)
+
+    def seek(self, position):
+        self._position = position
+        return position
+
+    def skip(self, count):
+        self._position += count
+        return count
+
+    def close(self):
+        pass
+
+
+class Transaction(object):
+
+    def commit(self):
+        CALLS.add("transaction.commit")
+
+    def rollback(self):
+        CALLS.add("transaction.rollback")
+
+
+class Blackboard(object):
+
+    def __init__(self, database):
+        self._db = database
+
+    # Wertet die Where-Klauseln des Plugins aus (Artefakttyp, Datenquelle, Artefakt-ID größer als)
+    def getDataArtifactsWhere(self, where):
+        CALLS.add("getDataArtifactsWhere")
+        type_id = _clause_int(where, r"artifact_type_id\s*=\s*(\d+)")
+        data_source_id = _clause_int(where, r"data_source_obj_id\s*=\s*(\d+)")
+        after = _clause_int(where, r"artifact_id\s*>\s*(\d+)") or 0
+        return [artifact for artifact in self._db.artifacts.get(type_id, [])
+                if (data_source_id is None or artifact.getDataSourceObjectID() == data_source_id)
+                and artifact.getArtifactID() > after]
+
+    # Analyseergebnisse eines Typs zu einer Liste von Objekt-IDs (Form der Abfrage aus InterestingFileBatch)
+    def getAnalysisResultsWhere(self, where):
+        CALLS.add("getAnalysisResultsWhere")
+        type_id = _clause_int(where, r"artifact_type_id\s*=\s*(\d+)")
+        match = re.search(r"obj_id\s+IN\s*\(([^)]*)\)", where)
+        object_ids = set(int(value) for value in match.group(1).split(",")) if match else None
+        return [result for result in self._db.artifacts.get(type_id, [])
+                if object_ids is None or result.getObjectID() in object_ids]
+
+    def newAnalysisResult(self, artifact_type, object_id, data_source_id, score, conclusion, configuration,
+                          justification, attributes, transaction):
+        CALLS.add("newAnalysisResult")
+        return self._db.add_artifact(artifact_type, object_id, data_source_id, attributes, configuration)
+
+    def newDataArtifact(self, artifact_type, source_id, data_source_id, attributes, os_account_id, transaction):
+        CALLS.add("newDataArtifact")
+        return self._db.add_artifact(artifact_type, source_id, data_source_id, attributes)
+
+    def postArtifacts(self, artifacts, module_name, ingest_job_id):
+        CALLS.add("postArtifacts")
+        CALLS.add("posted artifacts", len(artifacts))
+
+    def getOrAddArtifactType(self, name, display_name, category):
+        CALLS.add("getOrAddArtifactType")
+        if name not in self._db.artifact_types:
+            self._db.artifact_types[name] = ArtifactType(self._db.next_type_id(), name, display_name, category)
+        return self._db.artifact_types[name]
+
+    def getOrAddAttributeType(self, name, value_type, display_name):
+        CALLS.add("getOrAddAttributeType")
+        if name not in self._db.attribute_types:
+            self._db.attribute_types[name] = AttributeType(self._db.next_type_id(), name, value_type, display_name)
+        return self._db.attribute_types[name]
+
+
+_NAME_CLAUSE = re.compile(r"LOWER\(name\)\s*(?:IN\s*\((?P<names>[^)]*)\)|=\s*'(?P<name>[^']*)')"
+                          r"\s*AND\s*LOWER\(parent_path\)\s*LIKE\s*'(?P<like>[^']*)'")
+
+
+def _clause_int(where, pattern):
+    match = re.search(pattern, where)
+    return int(match.group(1)) if match else None
+
+
+class SleuthkitCase(object):
+
+    def __init__(self, database):
+        self._db = database
+        self._blackboard = Blackboard(database)
+
+    def getBlackboard(self):
+        return self._blackboard
+
+    # Wertet die Abfrage nach Beweisdateien aus: Gruppen aus Dateinamen und LIKE-Muster des Pfads
+    def findAllFilesWhere(self, where):
+        CALLS.add("findAllFilesWhere")
+        groups = []
+        for match in _NAME_CLAUSE.finditer(where):
+            names = set(re.findall(r"'([^']*)'", match.group("names"))) if match.group("names") else {match.group("name")}
+            like = re.compile("^" + ".*".join(re.escape(part) for part in match.group("like").split("%")) + "$")
+            groups.append((names, like))
+        data_source_id = _clause_int(where, r"^data_source_obj_id\s*=\s*(\d+)")
+        return [evidence_file for evidence_file in self._db.files
+                if (data_source_id is None or evidence_file.getDataSourceObjectId() == data_source_id)
+                and any(evidence_file.getName().lower() in names and like.match(evidence_file.getParentPath().lower())
+                        for names, like in groups)]
+
+    def getArtifactType(self, name):
+        CALLS.add("getArtifactType")
+        return self._db.artifact_types.get(name)
+
+    def getAttributeType(self, name):
+        CALLS.add("getAttributeType")
+        return self._db.attribute_types.get(name)
+
+    # Attribute der nächsten Artefakte eines Laufs in einer Datenquelle (Form der Abfrage aus ActivityStore)
+    def getMatchingAttributes(self, where):
+        CALLS.add("getMatchingAttributes")
+        type_id = _clause_int(where, r"artifact_type_id\s*=\s*(\d+)")
+        data_source_id = _clause_int(where, r"data_source_obj_id\s*=\s*(\d+)")
+        run_type_id = _clause_int(where, r"attribute_type_id\s*=\s*(\d+)")
+        run_id = re.search(r"value_text\s*=\s*'([^']*)'", where).group(1)
+        after = _clause_int(where, r"artifact_id\s*>\s*(\d+)") or 0
+        limit = _clause_int(where, r"LIMIT\s+(\d+)")
+        artifacts = [artifact for artifact in self._db.artifacts.get(type_id, [])
+                     if artifact.getDataSourceObjectID() == data_source_id and artifact.getArtifactID() > after
+                     and any(attribute.getAttributeType().getTypeID() == run_type_id
+                             and attribute.getValueString() == run_id for attribute in artifact._attributes)]
+        return [attribute for artifact in artifacts[:limit] for attribute in artifact._attributes]
+
+    def beginTransaction(self):
+        CALLS.add("beginTransaction")
+        return Transaction()
+
+
+# Artefakte, Dateien und Typen eines synthetischen Falls
+class Database(object):
+
+    def __init__(self):
+        self.artifacts = {}         # Typ-ID -> [Artefakte] in ID-Reihenfolge
+        self.files = []
+        self.artifact_types = {}
+        self.attribute_types = {}
+        self._next_id = 1
+        self._next_type_id = 10000
+        self._lock = threading.Lock()
+
+    def next_id(self):
+        with self._lock:
+            self._next_id += 1
+            return self._next_id
+
+    def next_type_id(self):
+        with self._lock:
+            self._next_type_id += 1
+            return self._next_type_id
+
+    def add_artifact(self, artifact_type, object_id, data_source_id, attributes, configuration=None):
+        artifact = Artifact(self.next_id(), artifact_type, object_id, data_source_id, attributes, configuration)
+        with self._lock:
+            self.artifacts.setdefault(artifact_type.getTypeID(), []).append(artifact)
+        return artifact
+
+    # Entfernt die vom Plugin angelegten Artefakte, damit eine Messung wiederholt werden kann
+    def reset_results(self):
+        with self._lock:
+            self.artifacts.pop(BlackboardArtifact.Type.TSK_INTERESTING_FILE_HIT.getTypeID(), None)
+            for artifact_type in self.artifact_types.values():
+                self.artifacts.pop(artifact_type.getTypeID(), None)
+
+
+# --- Autopsy ---
+
+class DataSource(object):
+
+    def __init__(self, data_source_id, name):
+        self._id = data_source_id
+        self._name = name
+
+    def getId(self):
+        return self._id
+
+    def getName(self):
+        return self._name
+
+
+class Case(object):
+    _current = None
+
+    def __init__(self, database, data_sources, module_directory):
+        self.database = database
+        self._sleuthkit_case = SleuthkitCase(database)
+        self._data_sources = data_sources
+        self._module_directory = module_directory
+        self.reports = []
+
+    @staticmethod
+    def getCurrentCase():
+        return Case._current
+
+    def getSleuthkitCase(self):
+        return self._sleuthkit_case
+
+    def getDataSources(self):
+        CALLS.add("getDataSources")
+        return list(self._data_sources)
+
+    def getModuleDirectory(self):
+        return self._module_directory
+
+    def addReport(self, path, module_name, display_name):
+        self.reports.append(path)
+
+
+class Logger(object):
+    messages = []
+
+    @staticmethod
+    def getLogger(name):
+        return Logger()
+
+    def logp(self, level, source_class, source_method, message):
+        Logger.messages.append((level, source_class, source_method, message))
+
+    def log(self, level, message):
+        Logger.messages.append((level, None, None, message))
+
+
+class ReportStatus(object):
+    QUEUING = "QUEUING"
+    RUNNING = "RUNNING"
+    COMPLETE = "COMPLETE"
+    CANCELED = "CANCELED"
+    ERROR = "ERROR"
+
+
+class GeneralReportModuleAdapter(object):
+    pass
+
+
+class IngestModuleFactoryAdapter(object):
+    pass
+
+
+class DataSourceIngestModule(object):
+    pass
+
+
+class _ProcessResult(object):
+    OK = "OK"
+    ERROR = "ERROR"
+
+
+class IngestModule(object):
+    ProcessResult = _ProcessResult
+
+
+class ProgressBar(object):
+
+    def __init__(self):
+        self.status = ReportStatus.QUEUING
+        self.progress = 0
+        self.labels = 0
+
+    def setIndeterminate(self, indeterminate):
+        pass
+
+    def switchToIndeterminate(self):
+        pass
+
+    def start(self):
+        self.status = ReportStatus.RUNNING
+
+    def setMaximumProgress(self, maximum):
+        pass
+
+    def updateStatusLabel(self, label):
+        self.labels += 1
+
+    def increment(self):
+        self.progress += 1
+
+    def getStatus(self):
+        return self.status
+
+    def complete(self, status):
+        self.status = status
+
+
+class ReportSettings(object):
+
+    def __init__(self, directory):
+        self._directory = directory
+
+    def getReportDirectoryPath(self):
+        return self._directory
+
+
+class IngestJobContext(object):
+
+    def dataSourceIngestIsCancelled(self):
+        return False
+
+    def getJobId(self):
+        return 1
+
+
+# Module, unter denen das Plugin die Klassen importiert
+_MODULES = {
+    "java.lang": ["Class", "Integer", "Long", "Runtime", "System"],
+    "java.io": ["IOException"],
+    "java.sql": ["DriverManager"],
+    "java.util": ["ArrayList", "Arrays"],
+    "java.util.logging": ["Level"],
+    "java.util.concurrent": ["Callable", "ExecutionException", "Executors", "TimeoutException", "TimeUnit"],
+    "java.util.concurrent.atomic": ["AtomicBoolean"],
+    "java.time": ["Instant", "ZoneId", "ZonedDateTime"],
+    "java.time.format": ["DateTimeFormatter"],
+    "org.sleuthkit.datamodel": ["TskData", "BlackboardArtifact", "BlackboardAttribute", "TskCoreException", "Score",
+                                "ReadContentInputStream"],
+    "org.sleuthkit.datamodel.Blackboard": ["BlackboardException"],
+    "org.sleuthkit.autopsy.casemodule": ["Case"],
+    "org.sleuthkit.autopsy.coreutils": ["Logger"],
+    "org.sleuthkit.autopsy.ingest": ["DataSourceIngestModule", "IngestModule", "IngestModuleFactoryAdapter"],
+    "org.sleuthkit.autopsy.report": ["GeneralReportModuleAdapter"],
+    "org.sleuthkit.autopsy.report.ReportProgressPanel": ["ReportStatus"],
+    "jarray": ["zeros"],
+}
+
+
+# Registriert die Ersatzmodule in sys.modules, bevor das Plugin importiert wird
+def install():
+    namespace = globals()
+    for module_name, names in _MODULES.items():
+        parts = module_name.split(".")
+        for index in range(1, len(parts) + 1):
+            name = ".".join(parts[:index])
+            if name not in sys.modules:
+                sys.modules[name] = types.ModuleType(name)
+            if index > 1:
+                setattr(sys.modules[".".join(parts[:index - 1])], parts[index - 1], sys.modules[name])
+        for name in names:
+            setattr(sys.modules[module_name], name, namespace[name])
+
+
+# --- Synthetische Fälle ---
+
+# Größe eines synthetischen Falls; Geräte, Programme und Ereignisse je Datenquelle
+class CaseConfig(object):
+
+    def __init__(self, data_sources=2, devices=50, programs=20000, suspicious_ratio=0.2, history_kb=256,
+                 evtx_events=20000, days=30, seed=1):
+        self.data_sources = data_sources
+        self.devices = devices
+        self.programs = programs
+        self.suspicious_ratio = suspicious_ratio
+        self.history_kb = history_kb
+        self.evtx_events = evtx_events
+        self.days = days
+        self.seed = seed
+
+
+BENIGN_PROGRAMS = ["notepad.exe", "chrome.exe", "explorer.exe", "svchost.exe", "winword.exe", "excel.exe",
+                   "teams.exe", "onedrive.exe", "msedge.exe", "code.exe"]
+SUSPICIOUS_PROGRAMS = ["cmd.exe", "powershell.exe", "whoami.exe", "ipconfig.exe", "netstat.exe", "curl.exe"]
+USB_MODELS = ["DataTraveler 3.0", "Cruzer Blade", "ROOT_HUB30", "Rubber Ducky", "USB Tablet"]
+CASE_START = 1700000000
+
+LOG_PATH = "/Windows/System32/winevt/Logs/"
+HISTORY_PATH = "/Users/user/AppData/Roaming/Microsoft/Windows/PowerShell/PSReadLine/"
+
+
+# Erzeugt einen Fall mit TSK_DEVICE_ATTACHED- und TSK_PROG_RUN-Artefakten, Event Logs und Befehlshistorien
+def build_case(config, module_directory):
+    random = Random(config.seed)
+    database = Database()
+    attribute = BlackboardAttribute.ATTRIBUTE_TYPE
+    data_sources = []
+    span = config.days * 86400
+    for number in range(config.data_sources):
+        data_source = DataSource(database.next_id(), "image%02d.e01" % number)
+        data_sources.append(data_source)
+        ds_id = data_source.getId()
+        for index in range(config.devices):
+            epoch = CASE_START + random.randint(0, span)
+            database.add_artifact(BlackboardArtifact.Type.TSK_DEVICE_ATTACHED, ds_id, ds_id, [
+                BlackboardAttribute(attribute.TSK_DATETIME, "RecentActivity", epoch),
+                BlackboardAttribute(attribute.TSK_DEVICE_ID, "RecentActivity", "USB\\VID_%04X&PID_%04X" % (index, number)),
+                BlackboardAttribute(attribute.TSK_DEVICE_MAKE, "RecentActivity", "Vendor %d" % (index % 7)),
+                BlackboardAttribute(attribute.TSK_DEVICE_MODEL, "RecentActivity", random.choice(USB_MODELS))])
+        for index in range(config.programs):
+            suspicious = random.random() < config.suspicious_ratio
+            name = random.choice(SUSPICIOUS_PROGRAMS if suspicious else BENIGN_PROGRAMS)
+            database.add_artifact(BlackboardArtifact.Type.TSK_PROG_RUN, ds_id, ds_id, [
+                BlackboardAttribute(attribute.TSK_DATETIME, "RecentActivity", CASE_START + random.randint(0, span)),
+                BlackboardAttribute(attribute.TSK_PROG_NAME, "RecentActivity", name.upper()),
+                BlackboardAttribute(attribute.TSK_COUNT, "RecentActivity", random.randint(1, 40)),
+                BlackboardAttribute(attribute.TSK_COMMENT, "RecentActivity", "Prefetch"),
+                BlackboardAttribute(attribute.TSK_PATH, "RecentActivity", "C:\\Windows\\Prefetch\\" + name.upper())])
+
+        # Beweisdateien: das Security-Log in voller Größe, die übrigen Logs klein
+        for name, events in (("Security.evtx", security_events(random, config.evtx_events, span)),
+                             ("Application.evtx", []),
+                             ("Windows PowerShell.evtx", powershell_events(random, config.evtx_events // 20, span)),
+                             ("Microsoft-Windows-Windows Defender%4Operational.evtx",
+                              defender_events(random, config.evtx_events // 50, span))):
+            database.files.append(AbstractFile(database.next_id(), ds_id, name, LOG_PATH, build_evtx(events)))
+        database.files.append(AbstractFile(database.next_id(), ds_id, "ConsoleHost_history.txt", HISTORY_PATH,
+                                           build_history(random, config.history_kb)))
+    return Case(database, data_sources, module_directory)
+
+
+# Befehlshistorie mit dem Defender-Indikator am Ende (ungünstigster Fall für die Suche)
+def build_history(random, size_kb):
+    commands = ["Get-ChildItem C:\\Users", "cd Documents", "Get-Process | Sort-Object CPU", "ipconfig /all",
+                "Invoke-WebRequest https://example.org -OutFile x.zip", "Expand-Archive x.zip"]
+    lines = []
+    size = 0
+    while size < size_kb * 1024:
+        line = random.choice(commands)
+        lines.append(line)
+        size += len(line) + 2
+    lines.append("Set-MpPreference -DisableRealtimeMonitoring $true")
+    return ("\r\n".join(lines) + "\r\n").encode("utf-8")
+
+
+def _event_times(random, count, span):
+    return sorted(CASE_START + random.randint(0, span) for _ in range(count))
+
+
+def security_events(random, count, span):
+    events = []
+    for epoch in _event_times(random, count, span):
+        kind = random.random()
+        if kind < 0.3:
+            events.append((epoch, 4688, [("SubjectUserName", "user"), ("NewProcessName", "C:\\Windows\\System32\\cmd.exe"),
+                                         ("CommandLine", "cmd.exe /c whoami"), ("ParentProcessName", "explorer.exe")]))
+        elif kind < 0.4:
+            events.append((epoch, 4624, [("TargetUserName", "user"), ("TargetDomainName", "WORKGROUP"),
+                                         ("LogonType", "2"), ("IpAddress", "-")]))
+        else:
+            events.append((epoch, 4672, [("SubjectUserName", "SYSTEM"), ("PrivilegeList", "SeDebugPrivilege")]))
+    return events
+
+
+def powershell_events(random, count, span):
+    details = "\tHostName=ConsoleHost\r\n\tEngineVersion=5.1\r\n\tHostApplication=powershell.exe -nop -w hidden"
+    return [(epoch, random.choice((400, 403, 600)), [(None, "Available"), (None, "None"), (None, details)])
+            for epoch in _event_times(random, count, span)]
+
+
+def defender_events(random, count, span):
+    return [(epoch, 5007, [("Product Name", "Microsoft Defender Antivirus"), ("Old Value", "DisableRealtimeMonitoring = 0x0"),
+                           ("New Value", "DisableRealtimeMonitoring = 0x1")])
+            for epoch in _event_times(random, count, span)]
+
+
+# --- EVTX-Dateien ---
+
+FILETIME_EPOCH_DELTA = 11644473600
+EVTX_CHUNK_SIZE = 0x10000
+
+
+# Baut einen 64-KiB-Block mit Template-Definitionen beim ersten Ereignis eines Typs
+class EvtxChunkBuilder(object):
+
+    def __init__(self):
+        self.data = bytearray(0x200)
+        self.names = {}             # Name -> Offset in der String-Tabelle des Blocks
+        self.templates = {}         # Template-Schlüssel -> Offset der Definition
+        self.first_id = None
+        self.last_id = None
+        self.last_offset = 0
+
+    # Verweis auf einen Namen; beim ersten Vorkommen folgt die Definition direkt auf den Verweis
+    def _name(self, out, base, text):
+        if text in self.names:
+            return struct.pack("<I", self.names[text])
+        offset = base + len(out) + 4
+        self.names[text] = offset
+        return struct.pack("<I", offset) + struct.pack("<IHH", 0, 0, len(text)) + text.encode("utf-16-le") + b"\x00\x00"
+
+    def _element(self, out, base, name, attributes=False):
+        out.extend(struct.pack("<BHI", 0x41 if attributes else 0x01, 0xffff, 0))
+        out.extend(self._name(out, base, name))
+        if attributes:
+            out.extend(struct.pack("<I", 0))
+
+    def _attribute(self, out, base, name, text=None, substitution=None):
+        out.append(0x06)
+        out.extend(self._name(out, base, name))
+        if substitution is not None:
+            out.extend(struct.pack("<BHB", 0x0e, substitution, 0x06))
+        else:
+            out.extend(struct.pack("<BBH", 0x05, 0x01, len(text)) + text.encode("utf-16-le"))
+
+    # Template: <Event><System><Provider/><EventID>%0</EventID></System><EventData><Data>%n</Data>...</EventData></Event>
+    def _template(self, base, fields):
+        out = bytearray(b"\x0f\x01\x01\x00")
+        self._element(out, base, "Event")
+        out.append(0x02)
+        self._element(out, base, "System")
+        out.append(0x02)
+        self._element(out, base, "Provider", True)
+        self._attribute(out, base, "Name", "BadUSB-Benchmark")
+        out.append(0x03)
+        self._element(out, base, "EventID", True)
+        self._attribute(out, base, "Qualifiers", substitution=len(fields) + 1)
+        out.append(0x02)
+        out.extend(struct.pack("<BHB", 0x0e, 0, 0x06))
+        out.append(0x04)
+        out.append(0x04)
+        self._element(out, base, "EventData")
+        out.append(0x02)
+        for index, name in enumerate(fields):
+            self._element(out, base, "Data", name is not None)
+            if name is not None:
+                self._attribute(out, base, "Name", name)
+            out.append(0x02)
+            out.extend(struct.pack("<BHB", 0x0e, index + 1, 0x01))
+            out.append(0x04)
+        out.extend(b"\x04\x04\x00")
+        return bytes(out)
+
+    # Hängt einen Datensatz an, False wenn der Block voll ist
+    def add(self, record_id, epoch, event_id, fields):
+        offset = len(self.data)
+        names = tuple(name for name, _ in fields)
+        body = bytearray(b"\x0f\x01\x01\x00\x0c\x01" + struct.pack("<I", event_id))
+        key = (event_id, names)
+        if key in self.templates:
+            body.extend(struct.pack("<I", self.templates[key]))
+        else:
+            template_offset = offset + 24 + len(body) + 4
+            xml = self._template(template_offset + 24, names)
+            body.extend(struct.pack("<I", template_offset) + struct.pack("<I", 0) + b"\x00" * 16
+                        + struct.pack("<I", len(xml)) + xml)
+        values = [struct.pack("<H", event_id)] + [value.encode("utf-16-le") for _, value in fields]
+        body.extend(struct.pack("<I", len(values)))
+        for index, value in enumerate(values):
+            body.extend(struct.pack("<HBB", len(value), 0x06 if index == 0 else 0x01, 0))
+        for value in values:
+            body.extend(value)
+        size = 24 + len(body) + 4
+        if offset + size > EVTX_CHUNK_SIZE:
+            if key not in self.templates:
+                self.names = dict((name, name_offset) for name, name_offset in self.names.items()
+                                  if name_offset < offset)
+            return False
+        if key not in self.templates:
+            self.templates[key] = template_offset
+        filetime = (epoch + FILETIME_EPOCH_DELTA) * 10000000
+        self.data.extend(struct.pack("<IIQQ", 0x2a2a, size, record_id, filetime) + body + struct.pack("<I", size))
+        if self.first_id is None:
+            self.first_id = record_id
+        self.last_id = record_id
+        self.last_offset = offset
+        return True
+
+    def build(self):
+        header = b"ElfChnk\x00" + struct.pack("<QQQQIIII", self.first_id, self.last_id, self.first_id, self.last_id,
+                                              128, self.last_offset, len(self.data), 0)
+        self.data[:len(header)] = header
+        return bytes(self.data) + b"\x00" * (EVTX_CHUNK_SIZE - len(self.data))
+
+
+# Baut ein Event Log aus (Epoch, Event-ID, [(Name oder None, Wert)]) in Datensatzreihenfolge
+def build_evtx(events):
+    chunks = []
+    chunk = EvtxChunkBuilder()
+    for record_id, (epoch, event_id, fields) in enumerate(events, 1):
+        if not chunk.add(record_id, epoch, event_id, fields):
+            chunks.append(chunk.build())
+            chunk = EvtxChunkBuilder()
+            chunk.add(record_id, epoch, event_id, fields)
+    if chunk.first_id is not None:
+        chunks.append(chunk.build())
+    return b"ElfFile\x00" + b"\x00" * (0x1000 - 8) + b"".join(chunks)
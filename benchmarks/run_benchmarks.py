@@ -0,0 +1,280 @@
+# coding=utf-8
+# Misst die Phasen des BadUSB-Moduls gegen synthetische Fälle ohne Autopsy-Installation.
+#
+#   python benchmarks/run_benchmarks.py --preset medium
+#   python benchmarks/run_benchmarks.py --data-sources 4 --devices 200 --programs 100000 --output bench_output.txt
+#
+# Je Phase werden Laufzeit, Spitzenspeicher (tracemalloc, in einem zweiten Durchlauf),
+# die Zugriffe auf die nachgebildete Datenbank und Zeilen pro Sekunde ausgegeben.
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import fake_autopsy
+fake_autopsy.install()
+import PlugInBadUSBAnalysis as plugin
+
+# Fallgrößen je Datenquelle: Datenquellen, USB-Geräte, Programmausführungen, Befehlshistorie in KiB, Security-Ereignisse
+PRESETS = {
+    "small": dict(data_sources=1, devices=20, programs=5000, history_kb=64, evtx_events=5000),
+    "medium": dict(data_sources=2, devices=100, programs=50000, history_kb=1024, evtx_events=50000),
+    "large": dict(data_sources=4, devices=500, programs=250000, history_kb=8192, evtx_events=250000),
+}
+
+# Zugriffe, die in der Tabelle ausgewiesen werden (Datenbank und Dateiinhalt)
+DB_CALLS = ["getDataArtifactsWhere", "getAttributes", "getAttribute", "findAllFilesWhere", "getAnalysisResultsWhere",
+            "newAnalysisResult", "newDataArtifact", "postArtifacts", "getMatchingAttributes", "beginTransaction"]
+IO_CALLS = ["ReadContentInputStream", "stream.read", "bytes read"]
+
+
+# Eine Messphase: setup bereitet jede Wiederholung vor, run liefert die Anzahl der verarbeiteten Zeilen
+class Phase(object):
+
+    def __init__(self, name, run, setup=None, unit="rows"):
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.unit = unit
+
+
+# Ergebnis einer Phase
+class Measurement(object):
+
+    def __init__(self, phase, seconds, peak_bytes, calls, rows):
+        self.phase = phase
+        self.seconds = seconds
+        self.peak_bytes = peak_bytes
+        self.calls = calls
+        self.rows = rows
+
+    @property
+    def rate(self):
+        return self.rows / self.seconds if self.seconds > 0 else float("inf")
+
+
+# Führt eine Phase aus: Laufzeit und Zugriffe ohne tracemalloc, Spitzenspeicher in einem zweiten Durchlauf
+def measure(phase, trace_memory=True):
+    if phase.setup is not None:
+        phase.setup()
+    before = fake_autopsy.CALLS.snapshot()
+    start = time.perf_counter()
+    rows = phase.run()
+    seconds = time.perf_counter() - start
+    calls = fake_autopsy.CALLS.snapshot()
+    calls.subtract(before)
+    peak = None
+    if trace_memory:
+        if phase.setup is not None:
+            phase.setup()
+        tracemalloc.start()
+        try:
+            phase.run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return Measurement(phase, seconds, peak, calls, rows)
+
+
+# Stellt die Messphasen für einen Fall zusammen
+def build_phases(case, work_dir, workers):
+    sleuthkit_case = case.getSleuthkitCase()
+    blackboard = sleuthkit_case.getBlackboard()
+    data_sources = case.getDataSources()
+    settings = plugin.load_settings()
+    indicator_sections = plugin.load_indicators(settings["indicators_file"])
+    indicators = plugin.IndicatorSet(indicator_sections)
+    window_minutes = settings["window_minutes"]
+    state = {}
+
+    # Artefakte laden und in kompakte Datensätze lesen
+    def load_artifacts():
+        rows = 0
+        state["records"] = []
+        for data_source in data_sources:
+            devices = plugin.load_new_artifacts(blackboard, plugin.BlackboardArtifact.Type.TSK_DEVICE_ATTACHED,
+                                                data_source.getId(), 0)
+            programs = plugin.load_new_artifacts(blackboard, plugin.BlackboardArtifact.Type.TSK_PROG_RUN,
+                                                 data_source.getId(), 0)
+            state["records"].append((plugin.load_device_records(devices), plugin.load_program_records(programs)))
+            rows += len(devices) + len(programs)
+        return rows
+
+    # Verdächtige Programme filtern, sortieren und per Zeitfenster den Geräten zuordnen
+    def correlate():
+        rows = 0
+        for devices, programs in state["records"]:
+            suspicious = [program for program in programs
+                          if program.epoch and indicators.executables.match(program.name_lower)]
+            suspicious.sort(key=lambda program: program.epoch)
+            correlator = plugin.TimeWindowCorrelator(suspicious, window_minutes)
+            for device in devices:
+                if device.is_virtual() or not device.epoch:
+                    continue
+                for program in correlator.match(device.epoch):
+                    correlator.format(program.epoch)
+                    rows += 1
+        return rows
+
+    # Beweisdateien aller Datenquellen mit einer Abfrage suchen
+    def evidence_lookup():
+        evidence = plugin.EvidenceIndex(sleuthkit_case)
+        return sum(len(evidence.files(data_source.getId(), name)) for data_source in data_sources
+                   for name in (plugin.APPLICATION_LOG, plugin.SECURITY_LOG, plugin.POWERSHELL_LOG,
+                                plugin.DEFENDER_LOG, plugin.POWERSHELL_HISTORY))
+
+    # PowerShell-Befehlshistorien bis zum Defender-Indikator durchsuchen
+    def history_scan():
+        evidence = plugin.EvidenceIndex(sleuthkit_case)
+        scanned = 0
+        for data_source in data_sources:
+            for history in evidence.files(data_source.getId(), plugin.POWERSHELL_HISTORY):
+                plugin.find_first_indicator(history, indicators.defender_tamper)
+                scanned += history.getSize()
+        return scanned
+
+    # Ereignisse des Security-Logs im Zeitfenster der Geräte lesen
+    def event_logs():
+        evidence = plugin.EvidenceIndex(sleuthkit_case)
+        rows = 0
+        for data_source, (devices, _) in zip(data_sources, state["records"]):
+            windows = plugin.DeviceWindows([device.epoch for device in devices
+                                            if device.epoch and not device.is_virtual()], window_minutes)
+            for log_file in evidence.files(data_source.getId(), plugin.SECURITY_LOG):
+                for _ in plugin.iter_evtx_events(log_file, plugin.SECURITY_LOG, windows, lambda: False):
+                    rows += 1
+        return rows
+
+    # Korrelation und Event Logs arbeiten auf den geladenen Datensätzen
+    def ensure_records():
+        if "records" not in state:
+            load_artifacts()
+
+    # Vollständiger Bericht über generateReport, ohne und mit Checkpoint
+    report_dir = os.path.join(work_dir, "report")
+    report_path = os.path.join(report_dir, plugin.CSVReportModule().getRelativeFilePath())
+
+    def patch_settings(**overrides):
+        plugin.load_settings = lambda path=None: dict(settings, workers=workers, **overrides)
+
+    def reset_case(**overrides):
+        patch_settings(**overrides)
+        case.database.reset_results()
+        shutil.rmtree(case.getModuleDirectory(), ignore_errors=True)
+        if not os.path.isdir(report_dir):
+            os.makedirs(report_dir)
+
+    def prime_checkpoint():
+        reset_case(incremental=True)
+        generate_report()
+
+    def generate_report():
+        plugin.CSVReportModule().generateReport(fake_autopsy.ReportSettings(report_dir), fake_autopsy.ProgressBar())
+        with open(report_path, "rb") as report:
+            return sum(1 for _ in report) - 1
+
+    # Ingest-Modul je Datenquelle, danach liest der Bericht die gespeicherten Ergebnisse
+    def ingest():
+        module = plugin.BadUSBIngestModuleFactory().createDataSourceIngestModule(None)
+        module.startUp(fake_autopsy.IngestJobContext())
+        for data_source in data_sources:
+            module.process(data_source, fake_autopsy.ProgressBar())
+        return len(data_sources)
+
+    def prime_ingest():
+        reset_case(incremental=False)
+        ingest()
+
+    return [
+        Phase("artifacts", load_artifacts),
+        Phase("correlation", correlate, ensure_records),
+        Phase("evidence lookup", evidence_lookup, unit="files"),
+        Phase("history scan", history_scan, unit="bytes"),
+        Phase("event logs", event_logs, ensure_records, unit="events"),
+        Phase("report", generate_report, lambda: reset_case(incremental=False)),
+        Phase("report (rerun)", generate_report, prime_checkpoint),
+        Phase("ingest", ingest, lambda: reset_case(incremental=False), unit="sources"),
+        Phase("report (ingested)", generate_report, prime_ingest),
+    ]
+
+
+def format_bytes(value):
+    if value is None:
+        return "-"
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if value < 1024 or unit == "GiB":
+            return "%.1f %s" % (value, unit)
+        value /= 1024.0
+
+
+# Gibt die Messungen als Tabelle aus, die Zugriffe je Phase darunter
+def format_results(config, workers, measurements):
+    lines = ["BadUSB benchmark: %d data source(s), %d devices, %d program runs, %d KiB history, "
+             "%d Security events per data source, %d worker(s)"
+             % (config.data_sources, config.devices, config.programs, config.history_kb, config.evtx_events, workers),
+             "",
+             "%-20s %10s %12s %14s %18s" % ("phase", "seconds", "peak memory", "rows", "rows/s")]
+    for measurement in measurements:
+        lines.append("%-20s %10.3f %12s %14s %18s" % (
+            measurement.phase.name, measurement.seconds, format_bytes(measurement.peak_bytes),
+            "%d %s" % (measurement.rows, measurement.phase.unit), "%.0f" % measurement.rate))
+    lines.append("")
+    lines.append("%-20s %s" % ("phase", "calls"))
+    for measurement in measurements:
+        calls = ["%s=%d" % (name, measurement.calls[name]) for name in DB_CALLS + IO_CALLS if measurement.calls[name]]
+        lines.append("%-20s %s" % (measurement.phase.name, ", ".join(calls) or "-"))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the BadUSB module against a synthetic case.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    parser.add_argument("--data-sources", type=int)
+    parser.add_argument("--devices", type=int, help="USB devices per data source")
+    parser.add_argument("--programs", type=int, help="program runs per data source")
+    parser.add_argument("--history-kb", type=int, help="size of each PowerShell history in KiB")
+    parser.add_argument("--evtx-events", type=int, help="records in each Security.evtx")
+    parser.add_argument("--workers", type=int, default=0, help="report worker threads, 0 = CPU count")
+    parser.add_argument("--phase", action="append", help="run only the named phase(s)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--output", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    values = dict(PRESETS[args.preset])
+    for key in ("data_sources", "devices", "programs", "history_kb", "evtx_events"):
+        if getattr(args, key) is not None:
+            values[key] = getattr(args, key)
+    config = fake_autopsy.CaseConfig(**values)
+    workers = args.workers or os.cpu_count() or 1
+
+    work_dir = tempfile.mkdtemp(prefix="badusb-bench-")
+    try:
+        case = fake_autopsy.build_case(config, os.path.join(work_dir, "ModuleOutput"))
+        fake_autopsy.Case._current = case
+        phases = build_phases(case, work_dir, workers)
+        if args.phase:
+            phases = [phase for phase in phases if phase.name in args.phase]
+        measurements = []
+        for phase in phases:
+            measurements.append(measure(phase, not args.no_memory))
+            print("%-20s %.3f s" % (phase.name, measurements[-1].seconds), file=sys.stderr)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = format_results(config, workers, measurements)
+    print(results)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(results + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())